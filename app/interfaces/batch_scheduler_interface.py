@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+
+
+class BatchSchedulerInterface(ABC):
+    def __init__(self, engine: DetectionEngineInterface):
+        self.engine: DetectionEngineInterface = engine
+
+    @abstractmethod
+    async def infer(self, rgb_frame: np.ndarray, source: str = 'default') -> np.ndarray:
+        """Queue a frame for the next batch and return its (N, 6) detections once the batch has run."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Cancel the batches in flight and fail any frames still waiting for one."""
+        pass
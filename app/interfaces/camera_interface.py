@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple
 
 import numpy as np
 
@@ -9,8 +10,8 @@ class CameraInterface(ABC):
         pass
         self.frame_count: int = 0
         self.fps: float = 0
-        self.start_time: float = 0
         self.frame_rate: float = 0
+        self.raw_mjpeg: bool = False # Whether capture_encoded_frame returns camera JPEGs without re-encoding
 
     @abstractmethod
     def _set_camera_properties(self, video_config: dict) -> None:
@@ -22,6 +23,16 @@ class CameraInterface(ABC):
         """Capture a frame from the camera using opencv."""
         pass
 
+    @abstractmethod
+    def capture_encoded_frame(self) -> bytes:
+        """Capture a JPEG-compressed frame, straight from the camera when possible."""
+        pass
+
+    @abstractmethod
+    def get_latest_frame(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """Return the newest captured frame with its sequence number and timestamp, without waiting."""
+        pass
+
     @abstractmethod
     def release_resources(self) -> None:
         """Release camera resources."""
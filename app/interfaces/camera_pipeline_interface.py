@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.interfaces.camera_interface import CameraInterface
+from app.interfaces.clip_recorder_interface import ClipRecorderInterface
+from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.frame_hub_interface import FrameHubInterface
+from app.interfaces.monitor_interface import MonitorInterface
+from app.interfaces.state_manager_interface import StateManagerInterface
+
+
+class CameraPipelineInterface(ABC):
+    @abstractmethod
+    def __init__(self, *args, **kwargs):
+        self.camera_id: str = ''
+        self.video_config: dict = {}
+        self.camera_service: CameraInterface
+        self.state_manager_service: StateManagerInterface
+        self.detector_service: DetectorInterface
+        self.frame_hub: FrameHubInterface
+        self.monitor_service: MonitorInterface
+        self.clip_recorder: Optional[ClipRecorderInterface] = None
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start monitoring this camera."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop monitoring this camera."""
+        pass
+
+    @abstractmethod
+    def release_resources(self) -> None:
+        """Release this camera's resources."""
+        pass
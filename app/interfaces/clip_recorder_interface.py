@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class ClipRecorderInterface(ABC):
+    def __init__(self, clip_config: dict, source: str = 'default'):
+        self.frame_rate: float = clip_config.get('frame_rate', 10) # Camera frames per second the pre-roll is fed at
+
+    @abstractmethod
+    def add_frame(self, jpeg: bytes, timestamp: float) -> None:
+        """Add a camera frame to the pre-roll ring (and to the clip being recorded, if any)."""
+        pass
+
+    @abstractmethod
+    def trigger(self, timestamp: float) -> None:
+        """Start a clip from the pre-roll, continuing for the post-roll after timestamp."""
+        pass
+
+    @abstractmethod
+    def list_clips(self) -> List[dict]:
+        """Finished clips, newest first."""
+        pass
+
+    @abstractmethod
+    def get_clip_path(self, name: str) -> str:
+        """Path of a finished clip, or '' if there is no such clip."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the clip being recorded and stop the writer thread."""
+        pass
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+import numpy as np
+
+
+class DetectionEngineInterface(ABC):
+    @abstractmethod
+    def __init__(self, *args, **kwargs):
+        self.name: str = ''
+        self.names: Dict[int, str] = {}
+
+    @abstractmethod
+    def infer(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Runs the object detector on an RGB frame and returns an (N, 6) xyxy/confidence/class array in frame coordinates."""
+        pass
+
+    @abstractmethod
+    def infer_batch(self, rgb_frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Runs the object detector on several RGB frames in one pass, returning one (N, 6) array per frame."""
+        pass
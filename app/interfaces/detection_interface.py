@@ -1,41 +1,46 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Tuple
 
 import numpy as np
 
 
 class DetectionInterface(ABC):
     @abstractmethod
-    async def detect_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for faces detected in the frame."""
+    async def detect_faces(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for faces detected in the frame."""
         pass
 
     @abstractmethod
-    def _detect_faces_sync(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    def preprocess(self, frame: np.ndarray, input_scale: float = 1.0, use_buffers: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Produces the BGR and RGB frames at scale_factor that both detectors share."""
+        pass
+
+    @abstractmethod
+    def _detect_faces_sync(self, rgb_frame: np.ndarray) -> np.ndarray:
         """Synchronous detection object for faces."""
         pass
 
     @abstractmethod
-    async def detect_objects(self, frame: np.ndarray, object_class: str) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for objects detected in the frame."""
+    async def detect_objects(self, frame: np.ndarray, object_class: str, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for objects detected in the frame."""
         pass
 
     @abstractmethod
-    def _detect_objects_sync(self, frame: np.ndarray, object_class: str) -> List[Tuple[int, int, int, int]]:
+    def _detect_objects_sync(self, rgb_frame: np.ndarray, object_class: str) -> np.ndarray:
         """Synchronous detection logic for objects."""
         pass
 
     @abstractmethod
-    async def detect_persons(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for persons detected in the frame."""
+    async def detect_persons(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for persons detected in the frame."""
         pass
 
     @abstractmethod
-    async def detect_dogs(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for dogs detected in the frame."""
+    async def detect_dogs(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for dogs detected in the frame."""
         pass
 
     @abstractmethod
-    async def run_detection(self, frame: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], List[Tuple[int, int, int, int]]]:
-        """Runs both persons and face detections."""
+    async def run_detection(self, frame: np.ndarray, input_scale: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Runs both persons and face detections on a frame already scaled by input_scale."""
         pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+import numpy as np
+
+
+class DetectionWorkerInterface(ABC):
+    @abstractmethod
+    async def run_detection(self, frame: np.ndarray, input_scale: float, settings: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Runs person and face detection on a frame in worker processes."""
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """Stop the worker processes and free the shared memory."""
+        pass
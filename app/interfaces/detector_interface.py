@@ -14,6 +14,16 @@ class DetectorInterface(ABC):
         self.state_manager: StateManagerInterface = state_manager
           
     @abstractmethod
-    async def process_frame(self) -> np.ndarray:
-        """Process frame by performing detections."""
+    async def process_frame(self, render: bool = True) -> np.ndarray:
+        """Process frame by performing detections, returning the annotated frame when render is set."""
+        pass
+
+    @abstractmethod
+    async def process_encoded_frame(self, jpeg: bytes) -> None:
+        """Perform detections on a JPEG frame without drawing on it."""
+        pass
+
+    @abstractmethod
+    def get_overlay(self) -> dict:
+        """Latest detections and state, for drawing on top of a passthrough stream."""
         pass
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+
+class ExecutorInterface(ABC):
+    @abstractmethod
+    async def run_inference(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking inference (or other detection) call on the inference pool."""
+        pass
+
+    @abstractmethod
+    async def run_encoding(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking image decode, encode or drawing call on the encoding pool."""
+        pass
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start measuring event loop lag."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop measuring event loop lag."""
+        pass
+
+    @abstractmethod
+    def get_metrics(self) -> dict:
+        """Event loop lag and pool usage."""
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """Shut down the thread pools."""
+        pass
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import AsyncGenerator, Optional, Tuple
+
+import numpy as np
+
+
+class FrameHubInterface(ABC):
+    def __init__(self):
+        self.subscriber_count: int = 0
+
+    @abstractmethod
+    async def publish(self, frame: np.ndarray) -> None:
+        """Publish a new annotated frame to all subscribers."""
+        pass
+
+    @abstractmethod
+    async def publish_encoded(self, jpeg: bytes) -> None:
+        """Publish an already JPEG-encoded frame to all subscribers."""
+        pass
+
+    @abstractmethod
+    async def wait_for_frame(self, last_sequence: int) -> Tuple[int, Optional[np.ndarray]]:
+        """Wait for a frame newer than last_sequence and return it with its sequence number."""
+        pass
+
+    @abstractmethod
+    async def get_chunk(self, sequence: int, frame: Optional[np.ndarray]) -> Optional[bytes]:
+        """Return the multipart JPEG chunk for a frame, encoding it at most once."""
+        pass
+
+    @abstractmethod
+    def subscribe(self) -> AsyncGenerator[Tuple[int, Optional[np.ndarray]], None]:
+        """Yield the latest published frames, skipping any that were missed."""
+        pass
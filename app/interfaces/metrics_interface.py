@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import ContextManager, Dict
+
+
+class MetricsInterface(ABC):
+    def __init__(self):
+        self.enabled: bool = False
+
+    @abstractmethod
+    def time(self, stage: str, source: str = 'default') -> ContextManager[None]:
+        """Context manager recording how long a pipeline stage takes."""
+        pass
+
+    @abstractmethod
+    def record(self, stage: str, seconds: float, source: str = 'default') -> None:
+        """Record one latency sample for a pipeline stage."""
+        pass
+
+    @abstractmethod
+    def tick(self, stream: str, source: str = 'default') -> None:
+        """Count a frame towards a stream's instantaneous frame rate."""
+        pass
+
+    @abstractmethod
+    def set_gauge(self, name: str, help_text: str, value: float, **labels: str) -> None:
+        """Set a gauge that is reported alongside the latency summaries."""
+        pass
+
+    @abstractmethod
+    def get_stage_latencies(self) -> Dict[str, Dict[str, dict]]:
+        """Latency quantiles, mean and sample count per source and stage, in milliseconds."""
+        pass
+
+    @abstractmethod
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        pass
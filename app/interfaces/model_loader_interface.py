@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+
+
+class ModelLoaderInterface(ABC):
+    @abstractmethod
+    def __init__(self, model_config: dict):
+        self.backend: str = 'torch'
+        self.image_size: int = 640
+        self.load_time: float = 0
+
+    @abstractmethod
+    def load(self, backend: str = '') -> DetectionEngineInterface:
+        """Load the detection engine for a backend (the configured one by default)."""
+        pass
+
+    @abstractmethod
+    def export(self, model_format: str) -> str:
+        """Export the hub model to TorchScript, ONNX or int8-quantized ONNX and return the file path."""
+        pass
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.frame_hub_interface import FrameHubInterface
+
+
+class MonitorInterface(ABC):
+    def __init__(self, monitor_config: dict, detector_service: DetectorInterface, frame_hub: FrameHubInterface, stream_mode: str = 'annotated'):
+        self.detector_service: DetectorInterface = detector_service
+        self.frame_hub: FrameHubInterface = frame_hub
+        self.stream_mode: str = stream_mode
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start the background monitoring loop."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop the background monitoring loop."""
+        pass
+
+    @abstractmethod
+    async def run(self) -> None:
+        """Continuously drive detection independently of any viewer."""
+        pass
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class MotionDetectorInterface(ABC):
+    @abstractmethod
+    def has_motion(self, frame: np.ndarray) -> bool:
+        """Whether the scene changed noticeably compared to the background model."""
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget the background model."""
+        pass
@@ -0,0 +1,25 @@
+from abc import abstractmethod
+
+from app.interfaces.notification_interface import NotificationInterface
+
+
+class NotificationDispatcherInterface(NotificationInterface):
+    @abstractmethod
+    def send_notification(self, message: str, source: str = 'default') -> None:
+        """Queue a notification to be sent in the background, without waiting for it."""
+        pass
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start sending queued notifications."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop sending queued notifications."""
+        pass
+
+    @abstractmethod
+    def get_metrics(self) -> dict:
+        """Counts of sent, failed, suppressed and dropped notifications."""
+        pass
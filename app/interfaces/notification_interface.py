@@ -3,6 +3,6 @@ from abc import ABC, abstractmethod
 
 class NotificationInterface(ABC):
     @abstractmethod
-    def send_notification(self, message: str) -> None:
-        """Send push notification to cell-phone."""
+    def send_notification(self, message: str, source: str = 'default') -> None:
+        """Send push notification to cell-phone. source names the camera that raised it."""
         pass
@@ -1,15 +1,17 @@
 from abc import ABC, abstractmethod
 from typing import Any, Generator
 
-import numpy as np
 from fastapi import Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import (HTMLResponse, JSONResponse, PlainTextResponse,
+                               RedirectResponse, Response, StreamingResponse)
+
+from app.interfaces.camera_pipeline_interface import CameraPipelineInterface
 
 
 class ServerInterface(ABC):
     @abstractmethod
-    async def video_feed(self) -> StreamingResponse:
-        """Video feed page of server."""
+    async def video_feed(self, camera_id: str = '') -> StreamingResponse:
+        """Video feed page of server for a camera, the first camera by default."""
         pass
 
     @abstractmethod
@@ -18,13 +20,38 @@ class ServerInterface(ABC):
         pass
         
     @abstractmethod
-    async def update_threshold(self, threshold: int = Form(...)) -> RedirectResponse:
+    async def overlay(self, camera_id: str = '') -> JSONResponse:
+        """Latest detections and state of a camera for drawing over the passthrough stream."""
+        pass
+
+    @abstractmethod
+    async def stats(self) -> JSONResponse:
+        """Event loop lag, worker pool usage, notification counts and each camera's state dwell times."""
+        pass
+
+    @abstractmethod
+    async def metrics_endpoint(self) -> PlainTextResponse:
+        """Stage latencies, frame rates and service gauges in the Prometheus text format."""
+        pass
+
+    @abstractmethod
+    async def clips(self) -> JSONResponse:
+        """Each camera's saved alert clips, newest first, with their download URLs."""
+        pass
+
+    @abstractmethod
+    async def clip(self, request: Request, camera_id: str, name: str) -> Response:
+        """Download a saved clip, honouring Range requests so players can seek."""
+        pass
+
+    @abstractmethod
+    async def update_threshold(self, threshold: float = Form(...)) -> RedirectResponse:
         """Calculate notification threshold bounds."""
         pass
 
     @abstractmethod
-    async def serve_frame(self, frame: np.ndarray) -> Generator[Any, Any, Any]:
-        """Serve a frame to the video server."""
+    async def serve_frame(self, pipeline: CameraPipelineInterface) -> Generator[Any, Any, Any]:
+        """Serve a camera's frames to the video server."""
         pass
 
     @abstractmethod
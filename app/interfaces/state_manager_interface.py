@@ -1,22 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
 
 from app.interfaces.notification_interface import NotificationInterface
-from app.states.state_classes import IdleState, State
+from app.states.state_classes import IDLE, State
 
 
 class StateManagerInterface(ABC):
     @abstractmethod
     def __init__(self, config: dict, notification_service: NotificationInterface):
-        self.state: State = IdleState(self)
-        self.no_face_count: int = 0
-        self.max_no_face_count: int = 0
+        self.state: State = IDLE
+        self.no_face_time: float = 0
+        self.max_no_face_time: float = 0 # Seconds
         self.notification_service: NotificationInterface = notification_service
         self.message: str = ""
 
     @abstractmethod
-    def process_frame(self, person_detected: bool, face_detected: bool) -> None:
-        """Delegate frame processing to the current state."""
-        self.state.process_frame(person_detected, face_detected)
+    def process_frame(self, person_detected: bool, face_detected: bool, timestamp: Optional[float] = None) -> None:
+        """Advance the state machine by one detection result, taken at timestamp (time.monotonic() seconds)."""
+        pass
 
     @abstractmethod
     def get_state(self) -> State:
@@ -27,3 +28,18 @@ class StateManagerInterface(ABC):
     def set_state(self, state: State) -> None:
         """Sets current state."""
         pass
+
+    @abstractmethod
+    def get_max_event_gap(self) -> float:
+        """Longest gap between detections that counts in full toward the no face time."""
+        pass
+
+    @abstractmethod
+    def get_dwell_time(self) -> float:
+        """Seconds spent in the current state so far."""
+        pass
+
+    @abstractmethod
+    def get_dwell_times(self) -> Dict[str, float]:
+        """Total seconds spent in each state, including the current stay."""
+        pass
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class TraceRecorderInterface(ABC):
+    @abstractmethod
+    def record(self, timestamp: float, state: int, person_bboxes: np.ndarray, face_bboxes: np.ndarray) -> None:
+        """Append one frame's detections and resulting state to the trace."""
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Hand buffered records to the writer thread."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write out everything recorded and stop the writer thread."""
+        pass
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class TrackerInterface(ABC):
+    @abstractmethod
+    def init(self, gray_frame: np.ndarray, bboxes: np.ndarray, frame_scale: float) -> None:
+        """Start tracking full resolution bboxes in a grayscale frame scaled by frame_scale."""
+        pass
+
+    @abstractmethod
+    def update(self, gray_frame: np.ndarray) -> np.ndarray:
+        """Returns the tracked bboxes, in full resolution coordinates, for the next frame."""
+        pass
@@ -0,0 +1,103 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.interfaces.batch_scheduler_interface import BatchSchedulerInterface
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.interfaces.executor_interface import ExecutorInterface
+
+
+class BatchSchedulerService(BatchSchedulerInterface):
+    def __init__(self, engine: DetectionEngineInterface, executor: ExecutorInterface, max_batch_size: int = 4, batch_window_ms: float = 10):
+        self.engine: DetectionEngineInterface = engine
+        self.executor: ExecutorInterface = executor
+        self.max_batch_size: int = max_batch_size
+        self.batch_window: float = batch_window_ms / 1000
+        # Per-source queues, served round-robin so a busy source cannot starve the others
+        self.pending: OrderedDict[str, Deque[Tuple[np.ndarray, asyncio.Future]]] = OrderedDict()
+        self.pending_count: int = 0
+        self.flush_task: Optional[asyncio.Task] = None
+        self.batch_tasks: Set[asyncio.Task] = set() # Full batches started straight away, kept so they are not garbage collected
+        self.lock: asyncio.Lock = asyncio.Lock() # One batch runs on the engine at a time
+
+    async def infer(self, rgb_frame: np.ndarray, source: str = 'default') -> np.ndarray:
+        """Queue a frame for the next batch and return its (N, 6) detections once the batch has run."""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(source, deque()).append((rgb_frame, future))
+        self.pending_count += 1
+        if self.pending_count >= self.max_batch_size:
+            task = asyncio.create_task(self._flush())
+            self.batch_tasks.add(task)
+            task.add_done_callback(self._batch_done)
+        elif self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        """Forget a finished batch task, reporting it if it failed outside the per-frame error handling."""
+        self.batch_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error in batch scheduler: {task.exception()}")
+
+    async def _flush_after_window(self) -> None:
+        """Give other sources a short window to join the batch, then run it."""
+        await asyncio.sleep(self.batch_window)
+        await self._flush()
+
+    def _next_batch(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Take up to max_batch_size pending frames, one source at a time in round-robin order."""
+        batch = []
+        while self.pending and len(batch) < self.max_batch_size:
+            source, queue = self.pending.popitem(last=False)
+            batch.append(queue.popleft())
+            if queue:
+                # Sources with frames left go to the back of the line
+                self.pending[source] = queue
+        self.pending_count -= len(batch)
+        return batch
+
+    async def _flush(self) -> None:
+        """Run the pending frames through the engine as one batch and resolve their futures."""
+        async with self.lock:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                results = await self.executor.run_inference(self.engine.infer_batch, [rgb_frame for rgb_frame, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future), detections in zip(batch, results):
+                if not future.done():
+                    future.set_result(detections)
+
+        # Frames queued while this batch ran get their own window
+        if self.pending and (self.flush_task is None or self.flush_task.done()):
+            self.flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def close(self) -> None:
+        """Cancel the batches in flight and fail any frames still waiting for one."""
+        tasks = list(self.batch_tasks)
+        if self.flush_task is not None:
+            tasks.append(self.flush_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.batch_tasks.clear()
+        self.flush_task = None
+
+        while self.pending:
+            _, queue = self.pending.popitem(last=False)
+            for _, future in queue:
+                if not future.done():
+                    future.cancel()
+        self.pending_count = 0
@@ -0,0 +1,94 @@
+from typing import Dict, Optional, Type
+
+from app.interfaces.batch_scheduler_interface import BatchSchedulerInterface
+from app.interfaces.camera_interface import CameraInterface
+from app.interfaces.camera_pipeline_interface import CameraPipelineInterface
+from app.interfaces.clip_recorder_interface import ClipRecorderInterface
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.interfaces.detection_worker_interface import DetectionWorkerInterface
+from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.executor_interface import ExecutorInterface
+from app.interfaces.frame_hub_interface import FrameHubInterface
+from app.interfaces.metrics_interface import MetricsInterface
+from app.interfaces.monitor_interface import MonitorInterface
+from app.interfaces.notification_interface import NotificationInterface
+from app.interfaces.state_manager_interface import StateManagerInterface
+from app.interfaces.trace_recorder_interface import TraceRecorderInterface
+from app.services.clip_recorder_service import ClipRecorderService
+from app.services.detection_service import DetectionService
+from app.services.detector_service import DetectorService
+from app.services.ffmpeg_camera_service import FFmpegCameraService
+from app.services.file_camera_service import FileCameraService
+from app.services.frame_hub_service import FrameHubService
+from app.services.monitor_service import MonitorService
+from app.services.motion_detector_service import MotionDetectorService
+from app.services.opencv_camera_service import OpenCVCameraService
+from app.services.state_manager_service import StateManagerService
+from app.services.template_tracker_service import \
+    TemplateTrackerService as TrackerService
+from app.services.trace_recorder_service import TraceRecorderService
+
+CAMERA_BACKENDS: Dict[str, Type[CameraInterface]] = {'opencv': OpenCVCameraService, 'ffmpeg': FFmpegCameraService, 'file': FileCameraService}
+
+
+class CameraPipelineService(CameraPipelineInterface):
+    def __init__(self, camera_config: dict, config: dict, engine: Optional[DetectionEngineInterface],
+                 notification_service: NotificationInterface, executor: ExecutorInterface, metrics: MetricsInterface,
+                 batch_scheduler: Optional[BatchSchedulerInterface] = None, detection_workers: Optional[DetectionWorkerInterface] = None):
+        self.camera_id: str = str(camera_config.get('id', 'default'))
+        # Per-camera settings override the shared video settings
+        self.video_config: dict = {**config['video'], **camera_config}
+        video_config = self.video_config
+
+        CameraService = CAMERA_BACKENDS.get(video_config.get('camera_backend', 'opencv'), OpenCVCameraService)
+        self.camera_service: CameraInterface = CameraService(video_config)
+        detection_service = DetectionService(scale_factor=video_config.get('scale_factor', 0.25),
+                                             engine=engine,
+                                             confidence_threshold=video_config.get('confidence_threshold', 0.25),
+                                             cascade=video_config.get('cascade', False),
+                                             face_scale_factor=video_config.get('face_scale_factor'),
+                                             face_roi_padding=video_config.get('face_roi_padding', 0.1),
+                                             batch_scheduler=batch_scheduler,
+                                             source=self.camera_id,
+                                             executor=executor,
+                                             detection_workers=detection_workers,
+                                             metrics=metrics)
+        self.state_manager_service: StateManagerInterface = StateManagerService(config={**config, 'video': video_config}, notification_service=notification_service,
+                                                                                      source=self.camera_id)
+        if 'message' in camera_config:
+            # Lets each camera's alert say which room it came from
+            self.state_manager_service.message = camera_config['message']
+        # Trackers only pay off when some frames skip full detection; otherwise every frame is a keyframe
+        tracking = video_config.get('detection_interval', 1) > 1 or video_config.get('detection_interval_ms', 0) > 0
+        motion_detector = MotionDetectorService(pixel_threshold=video_config.get('motion_pixel_threshold', 15),
+                                                motion_threshold=video_config.get('motion_threshold', 0.01)) if video_config.get('motion_gate', False) else None
+        trace_config = config.get('trace', {})
+        self.trace_recorder: Optional[TraceRecorderInterface] = TraceRecorderService(trace_config, self.camera_id) if trace_config.get('enabled', False) else None
+        clip_config = config.get('clips', {})
+        self.clip_recorder: Optional[ClipRecorderInterface] = ClipRecorderService(clip_config, self.camera_id) if clip_config.get('enabled', False) else None
+        self.detector_service: DetectorInterface = DetectorService(self.camera_service, detection_service, self.state_manager_service, video_config=video_config,
+                                                                   person_tracker=TrackerService() if tracking else None,
+                                                                   face_tracker=TrackerService() if tracking else None,
+                                                                   motion_detector=motion_detector, executor=executor,
+                                                                   metrics=metrics, source=self.camera_id, trace_recorder=self.trace_recorder,
+                                                                   clip_recorder=self.clip_recorder)
+        self.frame_hub: FrameHubInterface = FrameHubService(executor=executor, metrics=metrics, source=self.camera_id)
+        self.monitor_service: MonitorInterface = MonitorService(config.get('monitor', {}), self.detector_service, self.frame_hub,
+                                                                stream_mode=video_config.get('stream_mode', 'annotated'),
+                                                                clip_recorder=self.clip_recorder)
+
+    def start(self) -> None:
+        """Start monitoring this camera."""
+        self.monitor_service.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring this camera."""
+        await self.monitor_service.stop()
+
+    def release_resources(self) -> None:
+        """Release this camera's resources."""
+        self.camera_service.release_resources()
+        if self.trace_recorder is not None:
+            self.trace_recorder.close()
+        if self.clip_recorder is not None:
+            self.clip_recorder.close()
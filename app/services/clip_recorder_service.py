@@ -0,0 +1,162 @@
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Deque, List, Optional, Tuple
+
+from app.interfaces.clip_recorder_interface import ClipRecorderInterface
+
+CLIP_EXTENSIONS: dict = {'mjpeg': '.mjpeg', 'h264': '.mp4'}
+CLIP_MEDIA_TYPES: dict = {'.mjpeg': 'video/x-motion-jpeg', '.mp4': 'video/mp4'}
+PARTIAL_EXTENSION: str = '.part'
+
+
+class ClipRecorderService(ClipRecorderInterface):
+    def __init__(self, clip_config: dict, source: str = 'default'):
+        self.directory: str = os.path.join(clip_config.get('directory', 'clips'), source)
+        os.makedirs(self.directory, exist_ok=True)
+        # Partial clips left behind by a crash are never finished, so they are cleared on startup
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(PARTIAL_EXTENSION):
+                os.remove(entry.path)
+        self.pre_roll: float = clip_config.get('pre_roll_seconds', 10.0)
+        self.post_roll: float = clip_config.get('post_roll_seconds', 5.0)
+        self.frame_rate: float = clip_config.get('frame_rate', 10) # Camera frames per second kept for clips (0 = every frame)
+        self.max_buffer_bytes: int = clip_config.get('max_buffer_bytes', 32 << 20) # Caps the pre-roll however large the frames are
+        # 'mjpeg' saves the camera's JPEGs back to back; 'h264' pipes them through a local ffmpeg into an mp4
+        self.format: str = clip_config.get('format', 'mjpeg')
+        self.max_clips: int = clip_config.get('max_clips', 100) # Oldest clips are deleted beyond this
+
+        # Pre-roll of already encoded frames, owned by the event loop thread
+        self.ring: Deque[Tuple[float, bytes]] = deque()
+        self.ring_bytes: int = 0
+        self.recording_until: Optional[float] = None
+
+        # Disk (and ffmpeg) work happens on the writer thread, so add_frame and trigger never block
+        self.write_queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def add_frame(self, jpeg: bytes, timestamp: float) -> None:
+        """Add a camera frame to the pre-roll ring (and to the clip being recorded, if any)."""
+        if not jpeg:
+            return
+        self.ring.append((timestamp, jpeg))
+        self.ring_bytes += len(jpeg)
+        while self.ring and (self.ring_bytes > self.max_buffer_bytes or timestamp - self.ring[0][0] > self.pre_roll):
+            self.ring_bytes -= len(self.ring.popleft()[1])
+
+        if self.recording_until is not None:
+            self.write_queue.put(('frame', jpeg))
+            if timestamp >= self.recording_until:
+                self.write_queue.put(('end', None))
+                self.recording_until = None
+
+    def trigger(self, timestamp: float) -> None:
+        """Start a clip from the pre-roll, continuing for the post-roll after timestamp."""
+        if self.recording_until is not None:
+            # Already recording; the clip covers this event too
+            return
+        self.recording_until = timestamp + self.post_roll
+        self.write_queue.put(('start', list(self.ring)))
+
+    def _new_clip_path(self) -> str:
+        """Partial file path for a clip starting now, numbered when several start in the same second."""
+        extension = CLIP_EXTENSIONS.get(self.format, '.mjpeg')
+        base_path = os.path.join(self.directory, time.strftime('%Y%m%d-%H%M%S'))
+        path, index = base_path + extension, 1
+        while os.path.exists(path):
+            path, index = f'{base_path}-{index}{extension}', index + 1
+        return path + PARTIAL_EXTENSION
+
+    def _open_clip(self, path: str, frame_rate: float) -> Tuple[BinaryIO, Optional[subprocess.Popen]]:
+        """Open the clip file, or an ffmpeg process writing it, that JPEGs are written to."""
+        if self.format != 'h264':
+            return open(path, 'wb'), None
+        command = ['ffmpeg', '-loglevel', 'error', '-y',
+                   '-f', 'mjpeg', '-framerate', f'{frame_rate:.2f}', '-i', 'pipe:0',
+                   '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+                   '-f', 'mp4', path]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return process.stdin, process
+
+    def _write_loop(self) -> None:
+        """Write clips as start/frame/end messages arrive, until close() is called."""
+        output: Optional[BinaryIO] = None
+        process: Optional[subprocess.Popen] = None
+        path = ''
+        while True:
+            message, payload = self.write_queue.get()
+            try:
+                if message == 'start':
+                    pre_roll: List[Tuple[float, bytes]] = payload
+                    # The ring holds whatever rate frames arrived at, so the clip plays back at that rate
+                    duration = pre_roll[-1][0] - pre_roll[0][0] if len(pre_roll) > 1 else 0
+                    frame_rate = (len(pre_roll) - 1) / duration if duration > 0 else 1
+                    path = self._new_clip_path()
+                    output, process = self._open_clip(path, frame_rate)
+                    for _, jpeg in pre_roll:
+                        output.write(jpeg)
+                elif message == 'frame' and output is not None:
+                    output.write(payload)
+                elif message in ('end', 'close') and output is not None:
+                    output.close()
+                    if process is not None:
+                        process.wait()
+                    # Only finished clips lose the partial extension and show up in the listing
+                    os.replace(path, path[:-len(PARTIAL_EXTENSION)])
+                    output, process = None, None
+                    self._remove_old_clips()
+            except Exception as e:
+                # Any failure only loses this clip; the thread keeps serving later ones
+                print(f"Error writing clip {path}: {e}")
+                self._discard_clip(path, output, process)
+                output, process = None, None
+
+            if message == 'close':
+                return
+
+    def _discard_clip(self, path: str, output: Optional[BinaryIO], process: Optional[subprocess.Popen]) -> None:
+        """Stop writing a failed clip and delete its partial file, which retention would never remove."""
+        try:
+            if output is not None:
+                output.close()
+        except OSError:
+            pass # A broken ffmpeg pipe fails to flush on close
+        if process is not None:
+            process.kill()
+            process.wait()
+        if path.endswith(PARTIAL_EXTENSION) and os.path.exists(path):
+            os.remove(path)
+
+    def _remove_old_clips(self) -> None:
+        """Delete the oldest clips beyond max_clips."""
+        for clip in self.list_clips()[self.max_clips:]:
+            os.remove(os.path.join(self.directory, clip['name']))
+
+    def list_clips(self) -> List[dict]:
+        """Finished clips, newest first."""
+        clips = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and os.path.splitext(entry.name)[1] in CLIP_EXTENSIONS.values():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue # Removed by the writer thread's rotation since the scan listed it
+                clips.append({'name': entry.name, 'size': stat.st_size, 'modified': stat.st_mtime})
+        return sorted(clips, key=lambda clip: clip['modified'], reverse=True)
+
+    def get_clip_path(self, name: str) -> str:
+        """Path of a finished clip, or '' if there is no such clip."""
+        if name != os.path.basename(name) or os.path.splitext(name)[1] not in CLIP_EXTENSIONS.values():
+            return ''
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else ''
+
+    def close(self) -> None:
+        """Finish the clip being recorded and stop the writer thread."""
+        self.recording_until = None
+        self.write_queue.put(('close', None))
+        self.thread.join()
@@ -1,59 +1,163 @@
 import asyncio
-from typing import List, Tuple
+from typing import Dict, Optional, Tuple
 
 import face_recognition
 import numpy as np
-import torch
-from torch.nn import Module
 
+from app.interfaces.batch_scheduler_interface import BatchSchedulerInterface
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
 from app.interfaces.detection_interface import DetectionInterface
+from app.interfaces.detection_worker_interface import DetectionWorkerInterface
+from app.interfaces.executor_interface import ExecutorInterface
+from app.interfaces.metrics_interface import MetricsInterface
 from app.utils.opencv_utils import convert_bgr2rgb, resize_image
+from app.utils.yolo_utils import class_indices, filter_detections, scale_boxes
 
 
 class DetectionService(DetectionInterface):
-    def __init__(self, scale_factor: int):
-        self.yolo_model: Module = torch.hub.load('ultralytics/yolov5', 'yolov5s')
+    def __init__(self, scale_factor: int, engine: Optional[DetectionEngineInterface], executor: ExecutorInterface, metrics: MetricsInterface,
+                 confidence_threshold: float = 0.25, cascade: bool = False, face_scale_factor: Optional[float] = None, face_roi_padding: float = 0.1,
+                 batch_scheduler: Optional[BatchSchedulerInterface] = None, source: str = 'default',
+                 detection_workers: Optional[DetectionWorkerInterface] = None):
+        # The engine is only None when detection runs in worker processes, or in face-only workers
+        self.engine: Optional[DetectionEngineInterface] = engine
+        self.executor: ExecutorInterface = executor
+        self.metrics: MetricsInterface = metrics
+        # When set, person detection is batched with frames from other sources
+        self.batch_scheduler: Optional[BatchSchedulerInterface] = batch_scheduler
+        # When set, run_detection hands frames to worker processes instead of running detection here
+        self.detection_workers: Optional[DetectionWorkerInterface] = detection_workers
+        self.source: str = source
+        self.class_indices: Dict[str, int] = class_indices(engine.names) if engine is not None else {}
         self.scale_factor: int = scale_factor
+        self.confidence_threshold: float = confidence_threshold
 
-    def _scale_bbox(self, top: int, right: int, bottom: int, left: int) -> Tuple[int, int, int, int]:
-        """Scales bounding boxes based on scale_factor."""
-        return (int(top / self.scale_factor), int(right / self.scale_factor),
-                int(bottom / self.scale_factor), int(left / self.scale_factor))
-    
-    async def detect_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for faces detected in the frame."""
-        return await asyncio.to_thread(self._detect_faces_sync, frame)
-
-    def _detect_faces_sync(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for faces detected in the frame."""
-        small_frame = resize_image(frame, self.scale_factor)
-        rgb_frame = convert_bgr2rgb(small_frame)
-        face_locations = face_recognition.face_locations(rgb_frame)
-        return [self._scale_bbox(top, right, bottom, left) for (top, right, bottom, left) in face_locations]
-
-    async def detect_objects(self, frame: np.ndarray, object_class: str) -> List[Tuple[int, int, int, int]]:
-        """Returns a list of bounding box coordinates for detected objects of a specified class in the frame."""
-        return await asyncio.to_thread(self._detect_objects_sync, frame, object_class)
-
-    def _detect_objects_sync(self, frame: np.ndarray, object_class: str) -> List[Tuple[int, int, int, int]]:
-        """Synchronous detection logic for objects."""
-        small_frame = resize_image(frame, self.scale_factor)
-        yolo_results = self.yolo_model(small_frame)
-        yolo_locations = yolo_results.pandas().xyxy[0]
-        person_locations = yolo_locations[yolo_locations['name'] == object_class]
-        return [self._scale_bbox(int(row['ymin']), int(row['xmax']), int(row['ymax']), int(row['xmin'])) for _, row in person_locations.iterrows()]
-
-    async def detect_persons(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        # Cascaded mode only looks for faces inside person boxes, at face_scale_factor
+        self.cascade: bool = cascade
+        self.face_scale_factor: float = face_scale_factor or scale_factor
+        self.face_roi_padding: float = face_roi_padding
+
+        # Lowest resolution (relative to the camera) that inputs can be decoded at without losing detail
+        self.input_scale_factor: float = max(self.scale_factor, self.face_scale_factor) if cascade else self.scale_factor
+
+        # Settings the worker processes rebuild this service from
+        self.worker_settings: dict = {'scale_factor': scale_factor, 'confidence_threshold': confidence_threshold, 'cascade': cascade,
+                                      'face_scale_factor': self.face_scale_factor, 'face_roi_padding': face_roi_padding}
+
+        # Reused by run_detection so the hot loop does not allocate per frame
+        self.bgr_buffer: Optional[np.ndarray] = None
+        self.rgb_buffer: Optional[np.ndarray] = None
+
+    def _get_buffers(self, height: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the preallocated BGR/RGB buffers, reallocating only when the size changes."""
+        if self.bgr_buffer is None or self.bgr_buffer.shape[:2] != (height, width):
+            self.bgr_buffer = np.empty((height, width, 3), dtype=np.uint8)
+            self.rgb_buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self.bgr_buffer, self.rgb_buffer
+
+    def preprocess(self, frame: np.ndarray, input_scale: float = 1.0, use_buffers: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Produces the BGR and RGB frames at scale_factor that both detectors share."""
+        resize_factor = self.scale_factor / input_scale
+        height = round(frame.shape[0] * resize_factor)
+        width = round(frame.shape[1] * resize_factor)
+        bgr_buffer, rgb_buffer = self._get_buffers(height, width) if use_buffers else (None, None)
+
+        with self.metrics.time('resize', self.source):
+            if (height, width) == frame.shape[:2]:
+                small_frame = frame
+            else:
+                small_frame = resize_image(frame, resize_factor, dst=bgr_buffer)
+            rgb_frame = convert_bgr2rgb(small_frame, dst=rgb_buffer)
+        return small_frame, rgb_frame
+
+    async def detect_faces(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for faces detected in the frame."""
+        _, rgb_frame = await self.executor.run_inference(self.preprocess, frame, input_scale)
+        return await self.executor.run_inference(self._detect_faces_sync, rgb_frame)
+
+    def _detect_faces_sync(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for faces detected in the preprocessed RGB frame."""
+        with self.metrics.time('face', self.source):
+            face_locations = face_recognition.face_locations(rgb_frame)
+        return scale_boxes(face_locations, self.scale_factor)
+
+    def _detect_faces_in_rois_sync(self, frame: np.ndarray, input_scale: float, person_bboxes: np.ndarray) -> np.ndarray:
+        """Runs face detection only inside (padded) person boxes, at face_scale_factor."""
+        with self.metrics.time('face', self.source):
+            return self._detect_faces_in_rois(frame, input_scale, person_bboxes)
+
+    def _detect_faces_in_rois(self, frame: np.ndarray, input_scale: float, person_bboxes: np.ndarray) -> np.ndarray:
+        """Crops each padded person box out of the frame and looks for faces in it."""
+        height, width = frame.shape[:2]
+        crop_factor = self.face_scale_factor / input_scale
+        face_bboxes = []
+        for top, right, bottom, left in person_bboxes:
+            pad_y = (bottom - top) * self.face_roi_padding
+            pad_x = (right - left) * self.face_roi_padding
+            # Person boxes are in full resolution coordinates, the frame is scaled by input_scale
+            y0 = max(int((top - pad_y) * input_scale), 0)
+            y1 = min(int((bottom + pad_y) * input_scale), height)
+            x0 = max(int((left - pad_x) * input_scale), 0)
+            x1 = min(int((right + pad_x) * input_scale), width)
+            if y1 <= y0 or x1 <= x0:
+                continue
+
+            crop = frame[y0:y1, x0:x1]
+            if abs(crop_factor - 1) >= 1e-3:
+                crop = resize_image(crop, crop_factor)
+            for (face_top, face_right, face_bottom, face_left) in face_recognition.face_locations(convert_bgr2rgb(crop)):
+                face_bboxes.append((face_top / crop_factor + y0, face_right / crop_factor + x0,
+                                    face_bottom / crop_factor + y0, face_left / crop_factor + x0))
+        return scale_boxes(face_bboxes, input_scale)
+
+    async def detect_objects(self, frame: np.ndarray, object_class: str, input_scale: float = 1.0) -> np.ndarray:
+        """Returns an (N, 4) array of bounding box coordinates for detected objects of a specified class in the frame."""
+        _, rgb_frame = await self.executor.run_inference(self.preprocess, frame, input_scale)
+        return await self.executor.run_inference(self._detect_objects_sync, rgb_frame, object_class)
+
+    def _detect_objects_sync(self, rgb_frame: np.ndarray, object_class: str) -> np.ndarray:
+        """Synchronous detection logic for objects in the preprocessed RGB frame."""
+        with self.metrics.time('yolo', self.source):
+            detections = self.engine.infer(rgb_frame)
+        with self.metrics.time('postprocess', self.source):
+            return filter_detections(detections, self.class_indices[object_class], self.confidence_threshold, self.scale_factor)
+
+    async def _detect_persons_rgb(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Detects persons in a preprocessed RGB frame, through the batch scheduler when there is one."""
+        if self.batch_scheduler is None:
+            return await self.executor.run_inference(self._detect_objects_sync, rgb_frame, 'person')
+        with self.metrics.time('yolo', self.source):
+            detections = await self.batch_scheduler.infer(rgb_frame, self.source)
+        with self.metrics.time('postprocess', self.source):
+            return filter_detections(detections, self.class_indices['person'], self.confidence_threshold, self.scale_factor)
+
+    async def detect_persons(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
         """Convenience function for detecting persons."""
-        return await self.detect_objects(frame, 'person')
+        return await self.detect_objects(frame, 'person', input_scale)
 
-    async def detect_dogs(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    async def detect_dogs(self, frame: np.ndarray, input_scale: float = 1.0) -> np.ndarray:
         """Convenience function for detecting dogs."""
-        return await self.detect_objects(frame, 'dog')
+        return await self.detect_objects(frame, 'dog', input_scale)
+
+    async def run_detection(self, frame: np.ndarray, input_scale: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Runs both persons and face detections on a frame already scaled by input_scale."""
+        if self.detection_workers is not None:
+            # Workers preprocess the frame themselves and only send back boxes; their stages are timed as one
+            with self.metrics.time('workers', self.source):
+                return await self.detection_workers.run_detection(frame, input_scale, self.worker_settings)
+
+        # Both detectors read the same buffers, which are only rewritten once they have finished
+        _, rgb_frame = await self.executor.run_inference(self.preprocess, frame, input_scale, True)
+
+        if self.cascade:
+            person_bboxes = await self._detect_persons_rgb(rgb_frame)
+            if len(person_bboxes) == 0:
+                return person_bboxes, scale_boxes([], self.scale_factor)
+            face_bboxes = await self.executor.run_inference(self._detect_faces_in_rois_sync, frame, input_scale, person_bboxes)
+            return person_bboxes, face_bboxes
 
-    async def run_detection(self, frame: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], List[Tuple[int, int, int, int]]]:
         person_bboxes, face_bboxes = await asyncio.gather(
-            self.detect_persons(frame),
-            self.detect_faces(frame)
+            self._detect_persons_rgb(rgb_frame),
+            self.executor.run_inference(self._detect_faces_sync, rgb_frame)
         )
         return person_bboxes, face_bboxes
@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.interfaces.detection_worker_interface import DetectionWorkerInterface
+from app.services.detection_service import DetectionService
+from app.services.inline_executor_service import InlineExecutorService
+from app.services.metrics_service import MetricsService
+from app.utils.shared_memory_utils import SharedFrameRing, attach_frame
+
+# State of each worker process, set up by _init_worker
+_engine: Optional[DetectionEngineInterface] = None
+_detection_services: Dict[tuple, DetectionService] = {}
+_segments: Dict[int, shared_memory.SharedMemory] = {} # By slot index
+
+
+def _init_worker(role: str, model_config: dict) -> None:
+    """Load the model in person workers; face workers only need face_recognition."""
+    global _engine
+    if role == 'person':
+        # Imported here so face workers do not pay for loading torch
+        from app.services.model_loader_service import ModelLoaderService
+        _engine = ModelLoaderService(model_config).load()
+
+
+def _detection_service(settings: dict) -> DetectionService:
+    """Worker-local DetectionService for a camera's detection settings."""
+    key = tuple(sorted(settings.items()))
+    detection_service = _detection_services.get(key)
+    if detection_service is None:
+        # Jobs call the synchronous stages directly, so the worker needs no thread pools or metrics of its own
+        detection_service = _detection_services[key] = DetectionService(engine=_engine, executor=InlineExecutorService(),
+                                                                         metrics=MetricsService({'enabled': False}), **settings)
+    return detection_service
+
+
+def _ping() -> None:
+    """No-op job used to start the worker processes ahead of the first frame."""
+
+
+def _detect_persons_job(slot: Tuple[int, str], shape: Tuple[int, ...], input_scale: float, settings: dict) -> np.ndarray:
+    """Person detection on a shared memory frame, returning only the boxes."""
+    detection_service = _detection_service(settings)
+    _, rgb_frame = detection_service.preprocess(attach_frame(_segments, slot, shape), input_scale, True)
+    return detection_service._detect_objects_sync(rgb_frame, 'person')
+
+
+def _detect_faces_job(slot: Tuple[int, str], shape: Tuple[int, ...], input_scale: float, settings: dict, person_bboxes: Optional[np.ndarray] = None) -> np.ndarray:
+    """Face detection on a shared memory frame (inside person_bboxes when given), returning only the boxes."""
+    detection_service = _detection_service(settings)
+    frame = attach_frame(_segments, slot, shape)
+    if person_bboxes is not None:
+        return detection_service._detect_faces_in_rois_sync(frame, input_scale, person_bboxes)
+    _, rgb_frame = detection_service.preprocess(frame, input_scale, True)
+    return detection_service._detect_faces_sync(rgb_frame)
+
+
+class DetectionWorkerService(DetectionWorkerInterface):
+    def __init__(self, model_config: dict, worker_config: dict):
+        # Spawned rather than forked, so workers do not inherit the server's threads and camera handles
+        context = multiprocessing.get_context('spawn')
+        self.person_pool = ProcessPoolExecutor(max_workers=worker_config.get('person_workers', 1), mp_context=context,
+                                               initializer=_init_worker, initargs=('person', model_config))
+        self.face_pool = ProcessPoolExecutor(max_workers=worker_config.get('face_workers', 1), mp_context=context,
+                                             initializer=_init_worker, initargs=('face', model_config))
+        self.frame_ring = SharedFrameRing(slot_count=worker_config.get('slots', 4), slot_bytes=worker_config.get('slot_bytes', 1 << 21))
+
+        # Start the workers (and load the model) now rather than on the first frame
+        self.person_pool.submit(_ping)
+        self.face_pool.submit(_ping)
+
+    async def run_detection(self, frame: np.ndarray, input_scale: float, settings: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Runs person and face detection on a frame in worker processes."""
+        loop = asyncio.get_running_loop()
+        async with self.frame_ring.acquire(frame) as slot:
+            if settings.get('cascade', False):
+                person_bboxes = await loop.run_in_executor(self.person_pool, _detect_persons_job, slot, frame.shape, input_scale, settings)
+                if len(person_bboxes) == 0:
+                    return person_bboxes, person_bboxes[:0]
+                face_bboxes = await loop.run_in_executor(self.face_pool, _detect_faces_job, slot, frame.shape, input_scale, settings, person_bboxes)
+                return person_bboxes, face_bboxes
+
+            # Each detector runs in its own process, so both use a core at the same time
+            person_bboxes, face_bboxes = await asyncio.gather(
+                loop.run_in_executor(self.person_pool, _detect_persons_job, slot, frame.shape, input_scale, settings),
+                loop.run_in_executor(self.face_pool, _detect_faces_job, slot, frame.shape, input_scale, settings)
+            )
+            return person_bboxes, face_bboxes
+
+    def shutdown(self) -> None:
+        """Stop the worker processes and free the shared memory."""
+        self.person_pool.shutdown(cancel_futures=True)
+        self.face_pool.shutdown(cancel_futures=True)
+        self.frame_ring.close()
@@ -1,34 +1,209 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+import cv2
 import numpy as np
 
 from app.interfaces.camera_interface import CameraInterface
+from app.interfaces.clip_recorder_interface import ClipRecorderInterface
 from app.interfaces.detection_interface import DetectionInterface
 from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.executor_interface import ExecutorInterface
+from app.interfaces.metrics_interface import MetricsInterface
+from app.interfaces.motion_detector_interface import MotionDetectorInterface
 from app.interfaces.state_manager_interface import StateManagerInterface
-from app.utils.opencv_utils import display_fps, draw_annotations, draw_bboxes
+from app.interfaces.trace_recorder_interface import TraceRecorderInterface
+from app.interfaces.tracker_interface import TrackerInterface
+from app.states.state_classes import NO_FACE_DETECTED
+from app.utils.opencv_utils import (convert_bgr2gray, decode_image,
+                                    decode_image_reduced, display_fps,
+                                    draw_annotations, draw_bboxes,
+                                    resize_image)
+
+EMPTY_FRAME: np.ndarray = np.empty((0, 0, 3), dtype=np.uint8)
 
 
 class DetectorService(DetectorInterface):
-    def __init__(self, camera_service: CameraInterface, detection_service: DetectionInterface, state_manager_service: StateManagerInterface):
+    def __init__(self, camera_service: CameraInterface, detection_service: DetectionInterface, state_manager_service: StateManagerInterface,
+                 executor: ExecutorInterface, metrics: MetricsInterface, video_config: Optional[dict] = None,
+                 person_tracker: Optional[TrackerInterface] = None, face_tracker: Optional[TrackerInterface] = None,
+                 motion_detector: Optional[MotionDetectorInterface] = None, source: str = 'default', trace_recorder: Optional[TraceRecorderInterface] = None,
+                 clip_recorder: Optional[ClipRecorderInterface] = None):
         self.camera_service: CameraInterface = camera_service
+        # Decoding and drawing go to the encoding pool and tracking to the inference pool; camera waits use the default executor
+        self.executor: ExecutorInterface = executor
+        self.metrics: MetricsInterface = metrics
+        self.source: str = source
         self.detection_service: DetectionInterface = detection_service
         self.state_manager_service: StateManagerInterface = state_manager_service
-         
-    async def process_frame(self) -> np.ndarray:
-        """Process frame by performing detections."""
-        frame = self.camera_service.capture_frame()
+        # When set, every detection result and the state it led to is appended to a trace for offline replay
+        self.trace_recorder: Optional[TraceRecorderInterface] = trace_recorder
+        # When set, a clip is saved whenever the no face alert fires (the monitor feeds its pre-roll)
+        self.clip_recorder: Optional[ClipRecorderInterface] = clip_recorder
+        self.overlay: dict = {'sequence': 0, 'width': 0, 'height': 0, 'persons': [], 'faces': [], 'annotation': '', 'color': (0, 0, 0), 'dwell_time': 0}
 
-        person_bboxes, face_bboxes = await self.detection_service.run_detection(frame)
-        if person_bboxes:
-            draw_bboxes(person_bboxes, frame)
-            if face_bboxes:
-                draw_bboxes(face_bboxes, frame)
-                self.state_manager_service.process_frame(True, True)
-            else:
-                self.state_manager_service.process_frame(True, False)
+        # Full detection runs on keyframes; boxes are tracked in between when trackers are provided
+        video_config = video_config or {}
+        self.person_tracker: Optional[TrackerInterface] = person_tracker
+        self.face_tracker: Optional[TrackerInterface] = face_tracker
+        self.detection_interval: int = video_config.get('detection_interval', 1)
+        self.detection_interval_ms: float = video_config.get('detection_interval_ms', 0)
+        self.frames_since_keyframe: int = self.detection_interval # The first frame is always a keyframe
+        self.last_keyframe_time: float = 0
+        # Without skipped frames every frame is a keyframe, so the trackers would be initialised and never used
+        self.tracking: bool = (person_tracker is not None and face_tracker is not None
+                               and (self.detection_interval > 1 or self.detection_interval_ms > 0))
+
+        # Without motion, the previous result is reused until motion_refresh_ms have passed
+        self.motion_detector: Optional[MotionDetectorInterface] = motion_detector
+        self.motion_refresh_ms: float = video_config.get('motion_refresh_ms', 5000)
+        self.last_result: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.last_result_time: float = 0
+
+    def _keyframe_due(self) -> bool:
+        """Whether the next frame should run full detection rather than tracking."""
+        if not self.tracking:
+            return True
+        if self.frames_since_keyframe + 1 >= self.detection_interval:
+            return True
+        return self.detection_interval_ms > 0 and (time.monotonic() - self.last_keyframe_time) * 1000 >= self.detection_interval_ms
+
+    def _tracking_frame(self, frame: np.ndarray, input_scale: float) -> Tuple[np.ndarray, float]:
+        """Small grayscale frame used for tracking, and its scale relative to the camera."""
+        scale_factor = self.detection_service.scale_factor
+        if input_scale > scale_factor:
+            frame = resize_image(frame, scale_factor / input_scale)
+            input_scale = scale_factor
+        return convert_bgr2gray(frame), input_scale
+
+    def _track_sync(self, frame: np.ndarray, input_scale: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Propagate the keyframe's boxes to a new frame."""
+        gray_frame, _ = self._tracking_frame(frame, input_scale)
+        return self.person_tracker.update(gray_frame), self.face_tracker.update(gray_frame)
+
+    def _init_trackers_sync(self, frame: np.ndarray, input_scale: float, person_bboxes: np.ndarray, face_bboxes: np.ndarray) -> None:
+        """Start tracking the boxes found on a keyframe."""
+        gray_frame, frame_scale = self._tracking_frame(frame, input_scale)
+        self.person_tracker.init(gray_frame, person_bboxes, frame_scale)
+        self.face_tracker.init(gray_frame, face_bboxes, frame_scale)
+
+    def _can_reuse_result(self, frame: np.ndarray) -> bool:
+        """Whether the scene is unchanged and the previous result is recent enough to reuse."""
+        if self.motion_detector is None:
+            return False
+        motion = self.motion_detector.has_motion(frame)
+        if motion or self.last_result is None:
+            return False
+        return (time.monotonic() - self.last_result_time) * 1000 < self.motion_refresh_ms
+
+    async def _detect(self, frame: np.ndarray, input_scale: float = 1.0, timestamp: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Run detections (or tracking between keyframes) on a frame captured at timestamp and advance the state machine."""
+        self.metrics.tick('detection', self.source)
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if await self.executor.run_inference(self._can_reuse_result, frame):
+            person_bboxes, face_bboxes = self.last_result
         else:
-            self.state_manager_service.process_frame(False, False)
+            if self._keyframe_due():
+                with self.metrics.time('detect', self.source):
+                    person_bboxes, face_bboxes = await self.detection_service.run_detection(frame, input_scale)
+                if self.tracking:
+                    await self.executor.run_inference(self._init_trackers_sync, frame, input_scale, person_bboxes, face_bboxes)
+                self.frames_since_keyframe = 0
+                self.last_keyframe_time = time.monotonic()
+            else:
+                with self.metrics.time('track', self.source):
+                    person_bboxes, face_bboxes = await self.executor.run_inference(self._track_sync, frame, input_scale)
+                self.frames_since_keyframe += 1
+
+            if len(person_bboxes) == 0:
+                face_bboxes = face_bboxes[:0]
+            self.last_result = (person_bboxes, face_bboxes)
+            self.last_result_time = time.monotonic()
 
-        draw_annotations(frame, self.state_manager_service.get_state())
-        display_fps(frame, self.camera_service.fps)
+        previous_state = self.state_manager_service.get_state()
+        self.state_manager_service.process_frame(len(person_bboxes) > 0, len(face_bboxes) > 0, timestamp)
+        state = self.state_manager_service.get_state()
+        if self.clip_recorder is not None and state is NO_FACE_DETECTED and previous_state is not NO_FACE_DETECTED:
+            self.clip_recorder.trigger(timestamp)
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(timestamp, state.id, person_bboxes, face_bboxes)
+        return person_bboxes, face_bboxes
+
+    def _decode_for_detection(self, jpeg: bytes, flip: bool = False) -> Tuple[np.ndarray, float]:
+        """Decode a JPEG straight to (roughly) the detection resolution."""
+        with self.metrics.time('decode', self.source):
+            frame, input_scale = decode_image_reduced(jpeg, self.detection_service.input_scale_factor)
+        if flip and frame.size > 0:
+            frame = cv2.flip(frame, 1)
+        return frame, input_scale
+
+    def _decode_and_annotate(self, jpeg: bytes, person_bboxes: np.ndarray, face_bboxes: np.ndarray) -> np.ndarray:
+        """Decode a JPEG at full resolution, mirror it and draw the detections on it."""
+        with self.metrics.time('decode_full', self.source):
+            frame = decode_image(jpeg)
+        if frame.size == 0:
+            return frame
+        return self._annotate(cv2.flip(frame, 1), person_bboxes, face_bboxes)
+
+    def _annotate(self, frame: np.ndarray, person_bboxes: np.ndarray, face_bboxes: np.ndarray) -> np.ndarray:
+        """Draw detections, state and frame rate onto a full resolution frame."""
+        with self.metrics.time('draw', self.source):
+            draw_bboxes(person_bboxes, frame)
+            draw_bboxes(face_bboxes, frame)
+
+            draw_annotations(frame, self.state_manager_service.get_state())
+            display_fps(frame, self.camera_service.fps)
 
         return frame
+
+    async def process_frame(self, render: bool = True) -> np.ndarray:
+        """Process frame by performing detections, returning the annotated frame when render is set."""
+        if not self.camera_service.raw_mjpeg:
+            with self.metrics.time('capture', self.source):
+                frame = await asyncio.to_thread(self.camera_service.capture_frame)
+            timestamp = time.monotonic()
+            if frame.size == 0:
+                return frame
+
+            person_bboxes, face_bboxes = await self._detect(frame, timestamp=timestamp)
+            if not render:
+                return EMPTY_FRAME
+            return await self.executor.run_encoding(self._annotate, frame, person_bboxes, face_bboxes)
+
+        # Detection only needs a small frame; the full resolution decode is skipped unless someone is watching
+        with self.metrics.time('capture', self.source):
+            jpeg = await asyncio.to_thread(self.camera_service.capture_encoded_frame)
+        timestamp = time.monotonic()
+        small_frame, input_scale = await self.executor.run_encoding(self._decode_for_detection, jpeg, True)
+        if small_frame.size == 0:
+            return EMPTY_FRAME
+
+        person_bboxes, face_bboxes = await self._detect(small_frame, input_scale, timestamp)
+        if not render:
+            return EMPTY_FRAME
+
+        return await self.executor.run_encoding(self._decode_and_annotate, jpeg, person_bboxes, face_bboxes)
+
+    async def process_encoded_frame(self, jpeg: bytes) -> None:
+        """Perform detections on a JPEG frame without drawing on it."""
+        timestamp = time.monotonic()
+        small_frame, input_scale = await self.executor.run_encoding(self._decode_for_detection, jpeg)
+        if small_frame.size == 0:
+            return
+
+        person_bboxes, face_bboxes = await self._detect(small_frame, input_scale, timestamp)
+        state = self.state_manager_service.get_state()
+        self.overlay = {'sequence': self.overlay['sequence'] + 1,
+                        'width': round(small_frame.shape[1] / input_scale),
+                        'height': round(small_frame.shape[0] / input_scale),
+                        'persons': person_bboxes.tolist(),
+                        'faces': face_bboxes.tolist(),
+                        'annotation': state.get_annotation(),
+                        'color': state.get_color(),
+                        'dwell_time': round(self.state_manager_service.get_dwell_time(), 1)}
+
+    def get_overlay(self) -> dict:
+        """Latest detections and state, for drawing on top of a passthrough stream."""
+        return self.overlay
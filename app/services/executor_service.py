@@ -0,0 +1,81 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.interfaces.executor_interface import ExecutorInterface
+
+
+class ExecutorService(ExecutorInterface):
+    def __init__(self, executor_config: Optional[dict] = None):
+        executor_config = executor_config or {}
+        # CPU heavy work runs on these pools so the event loop only handles I/O
+        self.inference_workers: int = executor_config.get('inference_workers', 2)
+        self.encoding_workers: int = executor_config.get('encoding_workers', 2)
+        self.inference_pool = ThreadPoolExecutor(max_workers=self.inference_workers, thread_name_prefix='inference')
+        self.encoding_pool = ThreadPoolExecutor(max_workers=self.encoding_workers, thread_name_prefix='encoding')
+
+        # Callers wait on the event loop once queue_depth jobs per worker are queued, rather than piling up in the pool
+        queue_depth: int = executor_config.get('queue_depth', 2)
+        self.inference_slots = asyncio.Semaphore(self.inference_workers * queue_depth)
+        self.encoding_slots = asyncio.Semaphore(self.encoding_workers * queue_depth)
+        self.inference_pending: int = 0
+        self.encoding_pending: int = 0
+
+        # Event loop lag is how late a timer fires; anything blocking the loop shows up here
+        self.lag_interval: float = executor_config.get('lag_interval_ms', 100) / 1000
+        self.loop_lag: float = 0
+        self.max_loop_lag: float = 0
+        self.lag_task: Optional[asyncio.Task] = None
+
+    async def run_inference(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking inference (or other detection) call on the inference pool."""
+        async with self.inference_slots:
+            self.inference_pending += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.inference_pool, functools.partial(func, *args))
+            finally:
+                self.inference_pending -= 1
+
+    async def run_encoding(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking image decode, encode or drawing call on the encoding pool."""
+        async with self.encoding_slots:
+            self.encoding_pending += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.encoding_pool, functools.partial(func, *args))
+            finally:
+                self.encoding_pending -= 1
+
+    async def _measure_loop_lag(self) -> None:
+        """Sleep for lag_interval over and over, recording how late each wake up is."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag = max(loop.time() - start - self.lag_interval, 0)
+            self.max_loop_lag = max(self.max_loop_lag, self.loop_lag)
+
+    def start(self) -> None:
+        """Start measuring event loop lag."""
+        self.lag_task = asyncio.create_task(self._measure_loop_lag())
+
+    async def stop(self) -> None:
+        """Stop measuring event loop lag."""
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+            await asyncio.gather(self.lag_task, return_exceptions=True)
+            self.lag_task = None
+
+    def get_metrics(self) -> dict:
+        """Event loop lag and pool usage."""
+        return {'loop_lag_ms': round(self.loop_lag * 1000, 3),
+                'max_loop_lag_ms': round(self.max_loop_lag * 1000, 3),
+                'inference_workers': self.inference_workers,
+                'inference_pending': self.inference_pending,
+                'encoding_workers': self.encoding_workers,
+                'encoding_pending': self.encoding_pending}
+
+    def shutdown(self) -> None:
+        """Shut down the thread pools."""
+        self.inference_pool.shutdown(wait=False, cancel_futures=True)
+        self.encoding_pool.shutdown(wait=False, cancel_futures=True)
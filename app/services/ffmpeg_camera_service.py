@@ -1,26 +1,49 @@
 import subprocess
 import threading
+import time
 from collections import deque
-from typing import Any, Generator, Optional
+from typing import Any, Generator, Optional, Tuple
 
+import cv2
 import numpy as np
 
 from app.interfaces.camera_interface import CameraInterface
+from app.utils.metrics_utils import FpsMeter
+from app.utils.mjpeg_utils import MJPEGSplitter
+from app.utils.opencv_utils import decode_image
+from app.utils.stream_utils import build_multipart_chunk
 
 
 class FFmpegCameraService(CameraInterface):
     def __init__(self, video_config):
-        self.scale_factor = video_config.get('scale_factor', 0.5)
-        self.buffer_size = video_config.get('buffer_size', 10)
-        self.frame_rate = video_config.get('frame_rate', 30)
-        self.image_height = video_config.get('image_height', 480)
-        self.image_width = video_config.get('image_width', 640)
-        self.camera_device = '/dev/video0'
+        self._set_camera_properties(video_config)
         self.frame_callback = None
         self.frame_buffer = deque(maxlen=self.buffer_size)
+        self.latest_frame: Optional[bytes] = None # Newest frame, kept for get_latest_frame since consumers pop frame_buffer
         self.running = True
         self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
+        self.splitter = MJPEGSplitter(chunk_size=video_config.get('read_chunk_size', 1 << 18))
+
+        self.frame_count: int = 0
+        self.fps: float = 0
+        self.fps_meter: FpsMeter = FpsMeter(video_config.get('fps_window', 30))
+        self.timestamp: float = 0
+
         self.ffmpeg_process = self._start_ffmpeg_process()
+        self.start()
+
+    def _set_camera_properties(self, video_config: dict) -> None:
+        """Sets camera properties passed to ffmpeg."""
+        self.scale_factor = video_config.get('scale_factor', 0.5)
+        self.buffer_size = video_config.get('buffer_size', 10)
+        self.frame_rate = video_config.get('frame_rate', 30)
+        self.image_height = video_config.get('image_height', 480)
+        self.image_width = video_config.get('image_width', 640)
+        self.fourcc = video_config.get('fourcc', 'MJPG')
+        device = video_config.get('device', 0)
+        self.camera_device = f'/dev/video{device}' if isinstance(device, int) else device
+        self.raw_mjpeg = True
 
     def _start_ffmpeg_process(self) -> subprocess.Popen:
         """
@@ -30,64 +53,102 @@ class FFmpegCameraService(CameraInterface):
             subprocess.Popen: The FFmpeg subprocess for capturing frames.
 
         """
-        # FFmpeg command to capture video from the camera at 1920x1080 and 30fps
         print("Starting ffmpeg command...")
         command = [
             'ffmpeg',
             '-f', 'v4l2',          # Use the Video4Linux2 input format (for Linux)
             '-framerate', f'{self.frame_rate}',
             '-video_size', f'{self.image_width}x{self.image_height}',
-            '-i', f'{self.camera_device}',
-            '-c:v', 'mpeg1video', # libx264 (previously)
-            '-preset', 'ultrafast',
-            '-tune', 'zerolatency',
-            '-f', 'mjpeg',
-            'pipe:1'
         ]
+        if self.fourcc == 'MJPG':
+            # The camera already produces JPEGs, so copy them through without re-encoding
+            command += ['-input_format', 'mjpeg', '-i', f'{self.camera_device}', '-c:v', 'copy']
+        else:
+            command += ['-i', f'{self.camera_device}', '-c:v', 'mjpeg', '-q:v', '5']
+        command += ['-f', 'mjpeg', 'pipe:1']
 
         return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
 
+    def _calculate_fps(self) -> None:
+        """Calculate the current frame rate over the last few frames."""
+        self.frame_count += 1
+        self.fps = self.fps_meter.tick()
+
     def _capture_frame(self):
-        """Capture camera frame using ffmpeg."""
+        """Capture JPEG frames from the ffmpeg pipe into frame_buffer."""
+        if self.ffmpeg_process.stdout is None:
+            raise RuntimeError("ffmpeg_process.stdout is None. Ensure the process is correctly initialized.")
+
         while self.running:
-            if self.ffmpeg_process.stdout is None:
-                raise RuntimeError("ffmpeg_process.stdout is None. Ensure the process is correctly initialized.")
+            try:
+                frames = self.splitter.read_frames(self.ffmpeg_process.stdout)
+            except (EOFError, ValueError):
+                if self.running:
+                    print("Error: ffmpeg stream ended unexpectedly.")
+                break
+
+            if not frames:
+                continue
 
-            # raw_frame = self.ffmpeg_process.stdout.read(self.image_width * self.image_height * 3)
-            raw_frame = self.ffmpeg_process.stdout.read()
-            if not raw_frame:
-                raise RuntimeError("Failed to capture frame via FFmpeg")
+            with self.frame_ready:
+                for frame in frames:
+                    self.frame_buffer.append(frame)
+                    self._calculate_fps()
+                self.latest_frame = frames[-1]
+                self.timestamp = time.time()
+                self.frame_ready.notify_all()
 
-            if not raw_frame:
-                return None
+            if self.frame_callback is not None:
+                self.frame_callback()
 
-            frame = raw_frame
-            # frame = np.frombuffer(raw_frame, dtype=np.uint8).reshape((self.image_height, self.image_width, 3))
-            with self.lock:
-                if frame is not None:
-                    self.frame_buffer.append(frame)
+        with self.frame_ready:
+            self.running = False
+            self.frame_ready.notify_all()
 
     def generate_frames(self) -> Generator[Any, Any, Any]:
         """Generate a frame for the video server."""
         while self.running:
-            frame = self.get_frame()
+            frame = self.get_frame(timeout=1.0)
             if frame is None:
                 continue
-            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            # ret, encoded_data = cv2.imencode('.jpg', frame)
-            # if ret:
-                # byte_data = encoded_data.tobytes()
-                # yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + byte_data + b'\r\n')
+            yield build_multipart_chunk(frame)
 
     def set_frame_callback(self, callback):
         """Sets a callback function to indicate when the frame is ready."""
         self.frame_callback = callback
 
-    def get_frame(self) -> Optional[np.ndarray]:
-        """Get frame from frame_bufer."""
-        with self.lock:
+    def get_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Get the oldest JPEG frame from frame_buffer, waiting up to timeout for one to arrive."""
+        with self.frame_ready:
+            if not self.frame_ready.wait_for(lambda: len(self.frame_buffer) > 0 or not self.running, timeout):
+                return None
             if len(self.frame_buffer) > 0:
                 return self.frame_buffer.popleft()
+            return None
+
+    def get_latest_frame(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """Return the newest JPEG frame (as a uint8 array) with its sequence number and timestamp, without waiting."""
+        with self.frame_ready:
+            if self.latest_frame is None:
+                return None, self.frame_count, self.timestamp
+            return np.frombuffer(self.latest_frame, dtype=np.uint8), self.frame_count, self.timestamp
+
+    def capture_frame(self) -> np.ndarray:
+        """Capture the next frame from ffmpeg, decoded to BGR."""
+        jpeg = self.get_frame(timeout=1.0)
+        if jpeg is None:
+            print("Error: Failed to capture image.")
+            return np.empty((0, 0, 3), dtype=np.uint8)
+
+        frame = decode_image(jpeg)
+        if frame.size == 0:
+            return frame
+        return cv2.flip(frame, 1)
+
+    def capture_encoded_frame(self) -> bytes:
+        """Capture the next JPEG frame from ffmpeg without decoding it."""
+        jpeg = self.get_frame(timeout=1.0)
+        return jpeg if jpeg is not None else b''
 
     def start(self) -> None:
         """Start stream thread."""
@@ -0,0 +1,130 @@
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.interfaces.camera_interface import CameraInterface
+from app.utils.metrics_utils import FpsMeter
+from app.utils.opencv_utils import encode_image
+
+
+class FileCameraService(CameraInterface):
+    """Plays a recorded clip (or generated frames) as if it were a camera, for benchmarks and offline runs."""
+
+    def __init__(self, video_config: dict):
+        self._set_camera_properties(video_config)
+        # Frames are loaded up front so disk reads and decoding do not show up in measurements
+        self.frames: List[np.ndarray] = self._load_frames()
+        if not self.frames:
+            raise Exception(f"Error: No frames could be read from {self.source_path}.")
+        self.jpegs: List[bytes] = [self._encode(frame) for frame in self.frames] if self.raw_mjpeg else []
+
+        self.index: int = 0
+        self.frame_count: int = 0
+        self.fps: float = 0
+        self.fps_meter: FpsMeter = FpsMeter(video_config.get('fps_window', 30))
+        self.timestamp: float = 0
+        self.next_frame_time: float = 0
+
+    def _set_camera_properties(self, video_config: dict) -> None:
+        """Sets playback properties."""
+        self.source_path: str = video_config.get('source_path', '') # Empty for synthetic frames
+        self.max_frames: int = video_config.get('max_frames', 300)
+        self.loop: bool = video_config.get('loop', True)
+        self.realtime: bool = video_config.get('realtime', False) # Pace playback at frame_rate instead of full speed
+        self.frame_rate: int = video_config.get('frame_rate', 30)
+        self.image_width: int = video_config.get('image_width', 640)
+        self.image_height: int = video_config.get('image_height', 480)
+        # Serve pre-encoded JPEGs, like an MJPEG camera with raw_capture
+        self.raw_mjpeg: bool = video_config.get('fourcc', 'MJPG') == 'MJPG' and video_config.get('raw_capture', True)
+        self.jpeg_quality: int = video_config.get('jpeg_quality', 90)
+
+    def _load_frames(self) -> List[np.ndarray]:
+        """Read up to max_frames from the clip, resized to the configured resolution, or generate them."""
+        if not self.source_path:
+            return self._synthetic_frames()
+
+        video_capture = cv2.VideoCapture(self.source_path)
+        frames = []
+        while len(frames) < self.max_frames:
+            ret, frame = video_capture.read()
+            if not ret:
+                break
+            if frame.shape[:2] != (self.image_height, self.image_width):
+                frame = cv2.resize(frame, (self.image_width, self.image_height), interpolation=cv2.INTER_AREA)
+            frames.append(frame)
+        video_capture.release()
+        return frames
+
+    def _synthetic_frames(self) -> List[np.ndarray]:
+        """Deterministic frames with a moving shape, so runs are repeatable without a recording."""
+        rng = np.random.default_rng(0)
+        background = rng.integers(0, 64, (self.image_height, self.image_width, 3), dtype=np.uint8)
+        radius = max(self.image_height // 8, 1)
+        frames = []
+        for index in range(self.max_frames):
+            frame = background.copy()
+            x = int((0.5 + 0.4 * np.sin(index / 15)) * self.image_width)
+            y = int((0.5 + 0.3 * np.cos(index / 20)) * self.image_height)
+            cv2.circle(frame, (x, y), radius, (200, 180, 160), -1)
+            frames.append(frame)
+        return frames
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        """JPEG-encode a frame once, at load time."""
+        ret, encoded_data = encode_image(frame, quality=self.jpeg_quality)
+        return encoded_data.tobytes() if ret else b''
+
+    def _next_index(self) -> Optional[int]:
+        """Advance playback, waiting for the frame's time in realtime mode; None once a non-looping clip ends."""
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return None
+            self.index = 0
+
+        if self.realtime:
+            delay = self.next_frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_frame_time = max(self.next_frame_time, time.monotonic()) + 1 / self.frame_rate
+
+        index = self.index
+        self.index += 1
+        self.timestamp = time.time()
+        self._calculate_fps()
+        return index
+
+    def _calculate_fps(self) -> None:
+        """Calculate the current frame rate over the last few frames."""
+        self.frame_count += 1
+        self.fps = self.fps_meter.tick()
+
+    def capture_frame(self) -> np.ndarray:
+        """Return the next frame of the clip, mirrored like the live cameras."""
+        index = self._next_index()
+        if index is None:
+            return np.empty((0, 0, 3), dtype=np.uint8)
+        return cv2.flip(self.frames[index], 1)
+
+    def capture_encoded_frame(self) -> bytes:
+        """Return the next frame of the clip as JPEG."""
+        index = self._next_index()
+        if index is None:
+            return b''
+        return self.jpegs[index] if self.raw_mjpeg else self._encode(self.frames[index])
+
+    def get_latest_frame(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """Return the most recently played frame with its sequence number and timestamp."""
+        if self.frame_count == 0:
+            return None, 0, 0
+        return self.frames[(self.index - 1) % len(self.frames)].copy(), self.frame_count, self.timestamp
+
+    def get_memory_usage(self) -> int:
+        """Bytes held by the loaded clip."""
+        return sum(frame.nbytes for frame in self.frames) + sum(len(jpeg) for jpeg in self.jpegs)
+
+    def release_resources(self) -> None:
+        """Release the loaded frames."""
+        self.frames.clear()
+        self.jpegs.clear()
@@ -0,0 +1,85 @@
+import asyncio
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional, Tuple
+
+import numpy as np
+
+from app.interfaces.executor_interface import ExecutorInterface
+from app.interfaces.frame_hub_interface import FrameHubInterface
+from app.interfaces.metrics_interface import MetricsInterface
+from app.utils.opencv_utils import encode_image
+from app.utils.stream_utils import build_multipart_chunk
+
+
+class FrameHubService(FrameHubInterface):
+    def __init__(self, executor: ExecutorInterface, metrics: MetricsInterface, cache_size: int = 2, source: str = 'default'):
+        self.executor: ExecutorInterface = executor
+        self.metrics: MetricsInterface = metrics
+        self.source: str = source
+        self.encode_lock: asyncio.Lock = asyncio.Lock() # Subscribers waiting on the same frame reuse the first one's encode
+        self.sequence: int = 0
+        self.frame: Optional[np.ndarray] = None
+        self.subscriber_count: int = 0
+        self.condition: asyncio.Condition = asyncio.Condition()
+        self.cache_size: int = cache_size
+        self.chunk_cache: OrderedDict[int, bytes] = OrderedDict()
+
+    async def publish(self, frame: np.ndarray) -> None:
+        """Publish a new annotated frame to all subscribers."""
+        self.metrics.tick('stream', self.source)
+        async with self.condition:
+            self.frame = frame
+            self.sequence += 1
+            self.condition.notify_all()
+
+    async def publish_encoded(self, jpeg: bytes) -> None:
+        """Publish an already JPEG-encoded frame to all subscribers."""
+        self.metrics.tick('stream', self.source)
+        async with self.condition:
+            self.frame = None
+            self.sequence += 1
+            self._cache_chunk(self.sequence, build_multipart_chunk(jpeg))
+            self.condition.notify_all()
+
+    async def wait_for_frame(self, last_sequence: int) -> Tuple[int, Optional[np.ndarray]]:
+        """Wait for a frame newer than last_sequence and return it with its sequence number."""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.sequence > last_sequence)
+            return self.sequence, self.frame
+
+    def _cache_chunk(self, sequence: int, chunk: bytes) -> None:
+        """Store a multipart chunk, evicting the oldest ones beyond cache_size."""
+        self.chunk_cache[sequence] = chunk
+        while len(self.chunk_cache) > self.cache_size:
+            self.chunk_cache.popitem(last=False)
+
+    async def get_chunk(self, sequence: int, frame: Optional[np.ndarray]) -> Optional[bytes]:
+        """Return the multipart JPEG chunk for a frame, encoding it at most once on the encoding pool."""
+        chunk = self.chunk_cache.get(sequence)
+        if chunk is not None or frame is None:
+            return chunk
+
+        async with self.encode_lock:
+            chunk = self.chunk_cache.get(sequence)
+            if chunk is not None:
+                return chunk
+
+            with self.metrics.time('encode', self.source):
+                ret, encoded_data = await self.executor.run_encoding(encode_image, frame)
+            if not ret:
+                return None
+
+            chunk = build_multipart_chunk(encoded_data)
+            self._cache_chunk(sequence, chunk)
+            return chunk
+
+    async def subscribe(self) -> AsyncGenerator[Tuple[int, Optional[np.ndarray]], None]:
+        """Yield the latest published frames, skipping any that were missed."""
+        self.subscriber_count += 1
+        try:
+            sequence = 0
+            while True:
+                sequence, frame = await self.wait_for_frame(sequence)
+                yield sequence, frame
+        finally:
+            self.subscriber_count -= 1
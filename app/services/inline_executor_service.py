@@ -0,0 +1,31 @@
+from typing import Any, Callable
+
+from app.interfaces.executor_interface import ExecutorInterface
+
+
+class InlineExecutorService(ExecutorInterface):
+    """Runs jobs directly in the calling thread, for processes (like detection workers) that are a pool themselves."""
+
+    async def run_inference(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking inference (or other detection) call in the calling thread."""
+        return func(*args)
+
+    async def run_encoding(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking image decode, encode or drawing call in the calling thread."""
+        return func(*args)
+
+    def start(self) -> None:
+        """Nothing to measure without an event loop of its own."""
+        pass
+
+    async def stop(self) -> None:
+        """Nothing to stop."""
+        pass
+
+    def get_metrics(self) -> dict:
+        """No pools, so no usage to report."""
+        return {}
+
+    def shutdown(self) -> None:
+        """No pools to shut down."""
+        pass
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.interfaces.metrics_interface import MetricsInterface
+from app.utils.metrics_utils import FpsMeter, format_labels, label_key
+
+METRIC_PREFIX: str = 'baby_monitor_'
+
+# Returned by time() when metrics are disabled, so instrumented code pays for little more than a method call
+NULL_TIMER: ContextManager[None] = nullcontext()
+
+
+class MetricsService(MetricsInterface):
+    def __init__(self, metrics_config: Optional[dict] = None):
+        metrics_config = metrics_config or {}
+        self.enabled: bool = metrics_config.get('enabled', False)
+        self.window_size: int = metrics_config.get('window_size', 1000) # Latency samples kept per stage for the quantiles
+        self.quantiles: Tuple[float, ...] = tuple(metrics_config.get('quantiles', [0.5, 0.95, 0.99]))
+        self.fps_window: int = metrics_config.get('fps_window', 30)
+
+        # Stages are timed from the event loop and from worker threads
+        self.lock = threading.Lock()
+        self.samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self.totals: Dict[Tuple[str, str], List[float]] = {} # [count, sum] over the whole run
+        self.fps_meters: Dict[Tuple[str, str], FpsMeter] = {}
+        self.gauges: Dict[str, Tuple[str, Dict[tuple, float]]] = {}
+
+    @contextmanager
+    def _timer(self, stage: str, source: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, source)
+
+    def time(self, stage: str, source: str = 'default') -> ContextManager[None]:
+        """Context manager recording how long a pipeline stage takes."""
+        if not self.enabled:
+            return NULL_TIMER
+        return self._timer(stage, source)
+
+    def record(self, stage: str, seconds: float, source: str = 'default') -> None:
+        """Record one latency sample for a pipeline stage."""
+        if not self.enabled:
+            return
+        key = (source, stage)
+        with self.lock:
+            window = self.samples.get(key)
+            if window is None:
+                window = self.samples[key] = deque(maxlen=self.window_size)
+                self.totals[key] = [0, 0.0]
+            window.append(seconds)
+            totals = self.totals[key]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def tick(self, stream: str, source: str = 'default') -> None:
+        """Count a frame towards a stream's instantaneous frame rate."""
+        if not self.enabled:
+            return
+        key = (source, stream)
+        with self.lock:
+            fps_meter = self.fps_meters.get(key)
+            if fps_meter is None:
+                fps_meter = self.fps_meters[key] = FpsMeter(self.fps_window)
+            fps_meter.tick()
+
+    def set_gauge(self, name: str, help_text: str, value: float, **labels: str) -> None:
+        """Set a gauge that is reported alongside the latency summaries."""
+        with self.lock:
+            self.gauges.setdefault(name, (help_text, {}))[1][label_key(labels)] = value
+
+    def get_stage_latencies(self) -> Dict[str, Dict[str, dict]]:
+        """Latency quantiles, mean and sample count per source and stage, in milliseconds."""
+        with self.lock:
+            samples = {key: np.fromiter(window, dtype=np.float64) for key, window in self.samples.items()}
+            totals = {key: tuple(values) for key, values in self.totals.items()}
+
+        stage_latencies: Dict[str, Dict[str, dict]] = {}
+        for (source, stage), values in sorted(samples.items()):
+            count, total = totals[(source, stage)]
+            latency = {f'p{round(quantile * 100)}_ms': value * 1000 for quantile, value in zip(self.quantiles, np.quantile(values, self.quantiles))}
+            stage_latencies.setdefault(source, {})[stage] = {**latency, 'mean_ms': total / count * 1000, 'count': count}
+        return stage_latencies
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            samples = {key: np.fromiter(window, dtype=np.float64) for key, window in self.samples.items()}
+            totals = {key: tuple(values) for key, values in self.totals.items()}
+            fps = {key: fps_meter.fps for key, fps_meter in self.fps_meters.items()}
+            gauges = {name: (help_text, dict(values)) for name, (help_text, values) in self.gauges.items()}
+
+        lines = [f'# HELP {METRIC_PREFIX}stage_latency_seconds Pipeline stage latency over the last {self.window_size} samples.',
+                 f'# TYPE {METRIC_PREFIX}stage_latency_seconds summary']
+        for (source, stage), values in sorted(samples.items()):
+            labels = {'source': source, 'stage': stage}
+            for quantile, value in zip(self.quantiles, np.quantile(values, self.quantiles)):
+                lines.append(f'{METRIC_PREFIX}stage_latency_seconds{format_labels({**labels, "quantile": quantile})} {value:.6f}')
+            count, total = totals[(source, stage)]
+            lines.append(f'{METRIC_PREFIX}stage_latency_seconds_sum{format_labels(labels)} {total:.6f}')
+            lines.append(f'{METRIC_PREFIX}stage_latency_seconds_count{format_labels(labels)} {count}')
+
+        lines += [f'# HELP {METRIC_PREFIX}fps Instantaneous frame rate over the last {self.fps_window} frames.',
+                  f'# TYPE {METRIC_PREFIX}fps gauge']
+        for (source, stream), value in sorted(fps.items()):
+            lines.append(f'{METRIC_PREFIX}fps{format_labels({"source": source, "stream": stream})} {value:.3f}')
+
+        for name, (help_text, values) in sorted(gauges.items()):
+            lines += [f'# HELP {METRIC_PREFIX}{name} {help_text}', f'# TYPE {METRIC_PREFIX}{name} gauge']
+            for key, value in sorted(values.items()):
+                lines.append(f'{METRIC_PREFIX}{name}{format_labels(dict(key))} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,142 @@
+import glob
+import json
+import os
+import time
+from typing import Dict, Tuple
+
+import torch
+from torch.nn import Module
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.interfaces.model_loader_interface import ModelLoaderInterface
+from app.services.onnxruntime_engine_service import OnnxRuntimeEngineService
+from app.services.opencv_dnn_engine_service import OpenCVDNNEngineService
+from app.services.torch_engine_service import TorchEngineService
+from app.services.torchscript_engine_service import TorchScriptEngineService
+
+MODEL_EXTENSIONS: Dict[str, str] = {'torchscript': '.torchscript', 'onnx': '.onnx', 'onnx_int8': '.int8.onnx'}
+
+# Exported model format each backend runs on
+BACKEND_FORMATS: Dict[str, str] = {'torchscript': 'torchscript', 'onnxruntime': 'onnx', 'onnxruntime_int8': 'onnx_int8', 'opencv_dnn': 'onnx'}
+
+
+class ModelLoaderService(ModelLoaderInterface):
+    def __init__(self, model_config: dict):
+        self.backend: str = model_config.get('backend', 'torch')
+        self.model_name: str = model_config.get('name', 'yolov5s')
+        self.repo: str = model_config.get('repo', 'ultralytics/yolov5')  # GitHub repo or a local clone of it
+        self.cache_dir: str = model_config.get('cache_dir', 'models')
+        self.weights: str = model_config.get('weights', '')              # Optional local .pt checkpoint
+        self.image_size: int = model_config.get('image_size', 640)
+        self.auto_export: bool = model_config.get('export', True)
+        self.min_confidence: float = model_config.get('nms_confidence', 0.25)
+        self.iou_threshold: float = model_config.get('iou_threshold', 0.45)
+        self.num_threads: int = model_config.get('num_threads', 0)
+        self.load_time: float = 0
+
+    def _model_path(self, model_format: str) -> str:
+        """Path of an exported model in the cache directory."""
+        return os.path.join(self.cache_dir, f'{self.model_name}{MODEL_EXTENSIONS[model_format]}')
+
+    def _names_path(self) -> str:
+        """Path of the class names saved next to exported models."""
+        return os.path.join(self.cache_dir, f'{self.model_name}.names.json')
+
+    def _hub_source(self) -> Tuple[str, str]:
+        """Returns the repo and source to load from, preferring local copies so no network is needed."""
+        if os.path.isdir(self.repo):
+            return self.repo, 'local'
+        repo, _, ref = self.repo.partition(':')
+        owner, _, name = repo.partition('/')
+        # torch.hub checks a repo out to <owner>_<name>_<ref> ('/' in the ref becomes '_'), where ref is the one given
+        # after ':' or else the repo's default branch, which is not always master
+        prefix = os.path.join(torch.hub.get_dir(), f'{owner}_{name}_')
+        candidates = [prefix + ref.replace('/', '_')] if ref else [prefix + 'main', prefix + 'master'] + sorted(glob.glob(prefix + '*'))
+        for cached_repo in candidates:
+            if os.path.isdir(cached_repo):
+                return cached_repo, 'local'
+        return self.repo, 'github'
+
+    def load_hub_model(self) -> Module:
+        """Load the YOLO model through torch.hub, using the local cache whenever it is populated."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        torch.hub.set_dir(os.path.join(self.cache_dir, 'hub'))
+        repo, source = self._hub_source()
+        # Always loaded from an explicit path: for a missing file named after a released checkpoint (e.g. yolov5s.pt),
+        # yolov5 downloads it to that path, so the weights land in cache_dir rather than the working directory
+        weights = os.path.abspath(self.weights or os.path.join(self.cache_dir, f'{self.model_name}.pt'))
+        return torch.hub.load(repo, 'custom', path=weights, source=source, trust_repo=True, skip_validation=True)
+
+    def export(self, model_format: str) -> str:
+        """Export the hub model to TorchScript, ONNX or int8-quantized ONNX and return the file path."""
+        if model_format == 'onnx_int8':
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            onnx_path = self._model_path('onnx')
+            if not os.path.isfile(onnx_path):
+                self.export('onnx')
+            path = self._model_path(model_format)
+            quantize_dynamic(onnx_path, path, weight_type=QuantType.QUInt8)
+            print(f"Quantized {onnx_path} to {path}")
+            return path
+
+        hub_model = self.load_hub_model()
+        # AutoShape -> DetectMultiBackend -> DetectionModel
+        model = hub_model.model.model.float().eval()
+        detect = model.model[-1]
+        detect.export = True # Return the raw (batch, anchors, 5 + classes) predictions only
+        dummy_input = torch.zeros(1, 3, self.image_size, self.image_size)
+
+        path = self._model_path(model_format)
+        with torch.no_grad():
+            if model_format == 'torchscript':
+                torch.jit.trace(model, dummy_input, strict=False).save(path)
+            elif model_format == 'onnx':
+                torch.onnx.export(model, dummy_input, path, opset_version=12,
+                                  input_names=['images'], output_names=['output'],
+                                  dynamic_axes={'images': {0: 'batch'}, 'output': {0: 'batch'}})
+            else:
+                raise ValueError(f"Unsupported model format: {model_format}")
+
+        with open(self._names_path(), 'w') as file:
+            json.dump(hub_model.names, file)
+        print(f"Exported {self.model_name} to {path}")
+        return path
+
+    def _load_names(self) -> Dict[int, str]:
+        """Load the class names saved when the model was exported."""
+        with open(self._names_path(), 'r') as file:
+            names = json.load(file)
+        items = names.items() if isinstance(names, dict) else enumerate(names)
+        return {int(index): name for index, name in items}
+
+    def _exported_model(self, model_format: str) -> Tuple[str, Dict[int, str]]:
+        """Path of an exported model and its class names, exporting it first if needed."""
+        path = self._model_path(model_format)
+        if not os.path.isfile(path) or not os.path.isfile(self._names_path()):
+            if not self.auto_export:
+                raise FileNotFoundError(f"Exported model not found: {path}")
+            self.export(model_format)
+        return path, self._load_names()
+
+    def load(self, backend: str = '') -> DetectionEngineInterface:
+        """Load the detection engine for a backend (the configured one by default)."""
+        backend = backend or self.backend
+        start_time = time.perf_counter()
+        if backend == 'torch':
+            engine = TorchEngineService(self.load_hub_model())
+        elif backend in BACKEND_FORMATS:
+            path, names = self._exported_model(BACKEND_FORMATS[backend])
+            if backend == 'torchscript':
+                engine = TorchScriptEngineService(path, names, self.image_size, self.min_confidence, self.iou_threshold)
+            elif backend == 'opencv_dnn':
+                engine = OpenCVDNNEngineService(path, names, self.image_size, self.min_confidence, self.iou_threshold)
+            else:
+                engine = OnnxRuntimeEngineService(path, names, self.image_size, self.min_confidence, self.iou_threshold,
+                                                  num_threads=self.num_threads, name=backend)
+        else:
+            raise ValueError(f"Unsupported detection backend: {backend}")
+
+        self.load_time = time.perf_counter() - start_time
+        print(f"Loaded {self.model_name} ({backend}) in {self.load_time:.2f}s")
+        return engine
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from app.interfaces.clip_recorder_interface import ClipRecorderInterface
+from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.frame_hub_interface import FrameHubInterface
+from app.interfaces.monitor_interface import MonitorInterface
+from app.utils.opencv_utils import encode_image
+
+
+class MonitorService(MonitorInterface):
+    def __init__(self, monitor_config: dict, detector_service: DetectorInterface, frame_hub: FrameHubInterface, stream_mode: str = 'annotated',
+                 clip_recorder: Optional[ClipRecorderInterface] = None):
+        self.detector_service: DetectorInterface = detector_service
+        self.frame_hub: FrameHubInterface = frame_hub
+        self.stream_mode: str = stream_mode
+        # Fed from the camera at its own rate, so clips do not drop to the detection cadence (idle_fps) when nobody is watching
+        self.clip_recorder: Optional[ClipRecorderInterface] = clip_recorder
+        self.latest_jpeg: bytes = b''
+        self.active_fps: float = monitor_config.get('active_fps', 30)
+        self.idle_fps: float = monitor_config.get('idle_fps', 2)
+        self.cpu_budget: float = monitor_config.get('cpu_budget', 0.8)
+        self.error_backoff: float = monitor_config.get('error_backoff', 1.0)
+        self.work_time: float = 0
+        self.tasks: List[asyncio.Task] = []
+        self.running: bool = False
+
+    def start(self) -> None:
+        """Start the background monitoring loop."""
+        self.running = True
+        self.tasks.append(asyncio.create_task(self.run()))
+        if self.stream_mode == 'passthrough':
+            self.tasks.append(asyncio.create_task(self.stream()))
+        if self.clip_recorder is not None:
+            self.tasks.append(asyncio.create_task(self.record_clips()))
+
+    async def stop(self) -> None:
+        """Stop the background monitoring loop."""
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def _has_viewers(self) -> bool:
+        """Whether anyone is currently watching the video feed."""
+        return self.frame_hub.subscriber_count > 0
+
+    def _next_interval(self) -> float:
+        """Time to wait before the next detection, given the current cadence and CPU budget."""
+        target_fps = self.active_fps if self._has_viewers() else self.idle_fps
+        min_interval = 1 / target_fps if target_fps > 0 else 0
+        # Keep work / (work + sleep) below the CPU budget
+        budget_sleep = self.work_time * (1 - self.cpu_budget) / self.cpu_budget if self.cpu_budget > 0 else 0
+        return max(min_interval - self.work_time, budget_sleep, 0)
+
+    async def _sleep(self, interval: float) -> None:
+        """Sleep for interval, waking early when a viewer connects in idle mode."""
+        had_viewers = self._has_viewers()
+        deadline = time.monotonic() + interval
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (not had_viewers and self._has_viewers()):
+                return
+            await asyncio.sleep(min(remaining, 0.1))
+
+    async def stream(self) -> None:
+        """Forward the camera's JPEG frames to viewers untouched, at the camera's frame rate."""
+        while self.running:
+            jpeg = await asyncio.to_thread(self.detector_service.camera_service.capture_encoded_frame)
+            if not jpeg:
+                await asyncio.sleep(self.error_backoff)
+                continue
+            self.latest_jpeg = jpeg
+            await self.frame_hub.publish_encoded(jpeg)
+
+    def _next_clip_frame(self, last_sequence: int) -> Tuple[bytes, int]:
+        """The camera's newest frame as JPEG and its sequence number, or b'' if nothing newer than last_sequence was captured."""
+        frame, sequence, _ = self.detector_service.camera_service.get_latest_frame()
+        if frame is None or sequence == last_sequence:
+            return b'', last_sequence
+        if frame.ndim != 3:
+            # Still compressed by the camera
+            return frame.tobytes(), sequence
+        ret, encoded_data = encode_image(frame)
+        return (encoded_data.tobytes() if ret else b''), sequence
+
+    async def record_clips(self) -> None:
+        """Feed the clip pre-roll with camera frames at the clip frame rate, in either stream mode."""
+        interval = 1 / self.clip_recorder.frame_rate if self.clip_recorder.frame_rate > 0 else 0
+        sequence = 0
+        while self.running:
+            start_time = time.monotonic()
+            # Peeks at the camera without consuming frames, so detection and streaming still see every one
+            jpeg, sequence = await self.detector_service.executor.run_encoding(self._next_clip_frame, sequence)
+            if jpeg:
+                self.clip_recorder.add_frame(jpeg, start_time)
+            await asyncio.sleep(max(interval - (time.monotonic() - start_time), 0.001))
+
+    async def _process(self) -> None:
+        """Run one detection step for the configured stream mode."""
+        if self.stream_mode == 'passthrough':
+            # Only sample frames the stream loop has already captured
+            if self.latest_jpeg:
+                await self.detector_service.process_encoded_frame(self.latest_jpeg)
+            return
+
+        frame = await self.detector_service.process_frame(render=self._has_viewers())
+        if frame.size != 0:
+            await self.frame_hub.publish(frame)
+
+    async def run(self) -> None:
+        """Continuously drive detection independently of any viewer."""
+        while self.running:
+            start_time = time.monotonic()
+            try:
+                await self._process()
+            except Exception as e:
+                print(f"Error in monitoring loop: {e}")
+                await asyncio.sleep(self.error_backoff)
+                continue
+
+            # Exponential moving average of the time spent per detection
+            self.work_time = 0.8 * self.work_time + 0.2 * (time.monotonic() - start_time)
+            await self._sleep(self._next_interval())
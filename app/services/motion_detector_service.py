@@ -0,0 +1,37 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.interfaces.motion_detector_interface import MotionDetectorInterface
+from app.utils.opencv_utils import convert_bgr2gray
+
+
+class MotionDetectorService(MotionDetectorInterface):
+    def __init__(self, thumbnail_size: Tuple[int, int] = (64, 36), alpha: float = 0.05, pixel_threshold: int = 15, motion_threshold: float = 0.01):
+        self.thumbnail_size: Tuple[int, int] = thumbnail_size # (width, height) of the grayscale thumbnail
+        self.alpha: float = alpha                             # Running average learning rate
+        self.pixel_threshold: int = pixel_threshold           # Per-pixel difference that counts as changed
+        self.motion_threshold: float = motion_threshold       # Fraction of changed pixels that counts as motion
+        self.background: Optional[np.ndarray] = None
+        self.thumbnail: np.ndarray = np.empty((thumbnail_size[1], thumbnail_size[0], 3), dtype=np.uint8)
+        self.gray: np.ndarray = np.empty((thumbnail_size[1], thumbnail_size[0]), dtype=np.uint8)
+        self.difference: np.ndarray = np.empty_like(self.gray)
+
+    def has_motion(self, frame: np.ndarray) -> bool:
+        """Whether the scene changed noticeably compared to the background model."""
+        cv2.resize(frame, self.thumbnail_size, dst=self.thumbnail, interpolation=cv2.INTER_AREA)
+        convert_bgr2gray(self.thumbnail, dst=self.gray)
+
+        if self.background is None:
+            self.background = self.gray.astype(np.float32)
+            return True
+
+        cv2.absdiff(self.gray, cv2.convertScaleAbs(self.background), dst=self.difference)
+        changed = np.count_nonzero(self.difference > self.pixel_threshold) / self.difference.size
+        cv2.accumulateWeighted(self.gray, self.background, self.alpha)
+        return changed >= self.motion_threshold
+
+    def reset(self) -> None:
+        """Forget the background model."""
+        self.background = None
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from app.interfaces.notification_dispatcher_interface import \
+    NotificationDispatcherInterface
+from app.interfaces.notification_interface import NotificationInterface
+
+
+class NotificationDispatcherService(NotificationDispatcherInterface):
+    def __init__(self, notification_service: NotificationInterface, notification_config: Optional[dict] = None):
+        notification_config = notification_config or {}
+        self.notification_service: NotificationInterface = notification_service
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=notification_config.get('queue_size', 16))
+        self.max_retries: int = notification_config.get('max_retries', 3)
+        self.retry_backoff: float = notification_config.get('retry_backoff', 1.0)
+        self.max_backoff: float = notification_config.get('max_backoff', 30.0)
+        # The same message from the same camera is only sent once per cooldown, however often it is raised
+        self.cooldown: float = notification_config.get('cooldown', 60.0)
+        self.last_sent: Dict[Tuple[str, str], float] = {} # Keyed by (source, message)
+        self.task: Optional[asyncio.Task] = None
+
+        self.sent: int = 0
+        self.failed: int = 0
+        self.suppressed: int = 0
+        self.dropped: int = 0
+
+    def send_notification(self, message: str, source: str = 'default') -> None:
+        """Queue a notification to be sent in the background, without waiting for it."""
+        key = (source, message)
+        last_sent = self.last_sent.get(key)
+        if last_sent is not None and time.monotonic() - last_sent < self.cooldown:
+            self.suppressed += 1
+            return
+
+        try:
+            self.queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"Notification queue full, dropping: {message}")
+            return
+        # Counted from when it was raised, so repeats are suppressed while it waits in the queue
+        self.last_sent[key] = time.monotonic()
+
+    async def _send_with_retry(self, source: str, message: str) -> None:
+        """Send one notification on a worker thread, backing off exponentially between attempts."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self.notification_service.send_notification, message, source)
+                self.sent += 1
+                return
+            except ValueError as e:
+                # Rejected outright (e.g. a bad API token), which retrying cannot fix
+                print(f"Notification rejected, not retrying: {e}")
+                break
+            except Exception as e:
+                print(f"Notification attempt {attempt + 1} failed: {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(self.retry_backoff * 2 ** attempt, self.max_backoff))
+
+        self.failed += 1
+        # Let the next occurrence try again rather than waiting out the cooldown
+        self.last_sent.pop((source, message), None)
+
+    async def run(self) -> None:
+        """Send queued notifications one at a time."""
+        while True:
+            source, message = await self.queue.get()
+            try:
+                await self._send_with_retry(source, message)
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        """Start sending queued notifications."""
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop sending queued notifications."""
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def get_metrics(self) -> dict:
+        """Counts of sent, failed, suppressed and dropped notifications."""
+        return {'queued': self.queue.qsize(),
+                'sent': self.sent,
+                'failed': self.failed,
+                'suppressed': self.suppressed,
+                'dropped': self.dropped}
@@ -0,0 +1,34 @@
+from typing import Dict, List
+
+import numpy as np
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.utils.yolo_utils import detect_letterboxed
+
+
+class OnnxRuntimeEngineService(DetectionEngineInterface):
+    def __init__(self, path: str, names: Dict[int, str], image_size: int = 640, min_confidence: float = 0.25, iou_threshold: float = 0.45,
+                 num_threads: int = 0, name: str = 'onnxruntime'):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads # 0 lets onnxruntime pick
+        self.name: str = name
+        self.session = onnxruntime.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name: str = self.session.get_inputs()[0].name
+        self.names: Dict[int, str] = names
+        self.image_size: int = image_size
+        self.min_confidence: float = min_confidence
+        self.iou_threshold: float = iou_threshold
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Raw forward pass on an NCHW blob."""
+        return self.session.run(None, {self.input_name: blob})[0]
+
+    def infer(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Runs the ONNX model on an RGB frame with onnxruntime."""
+        return self.infer_batch([rgb_frame])[0]
+
+    def infer_batch(self, rgb_frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Runs the ONNX model on several RGB frames as one batch with onnxruntime."""
+        return detect_letterboxed(rgb_frames, self.image_size, self._forward, self.min_confidence, self.iou_threshold)
@@ -1,20 +1,42 @@
+import threading
 import time
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from app.interfaces.camera_interface import CameraInterface
+from app.utils.metrics_utils import FpsMeter
+from app.utils.opencv_utils import decode_image, encode_image
 
-class OpenCVCameraService:
+EMPTY_FRAME: np.ndarray = np.empty((0, 0, 3), dtype=np.uint8)
+
+
+class OpenCVCameraService(CameraInterface):
     def __init__(self, video_config: dict):
-        self.video_capture = cv2.VideoCapture(0)
+        self.video_capture = cv2.VideoCapture(video_config.get('device', 0))
         if not self.video_capture.isOpened():
             raise Exception("Error: Could not open webcam.")
 
+        # Keep the camera's MJPEG frames compressed so callers decide how (and whether) to decode them
+        self.raw_mjpeg: bool = video_config.get('fourcc', 'MJPG') == 'MJPG' and video_config.get('raw_capture', True)
         self._set_camera_properties(video_config)
  
         self.frame_count: int = 0
         self.fps: float = 0
-        self.start_time: float = time.time()
+        self.fps_meter: FpsMeter = FpsMeter(video_config.get('fps_window', 30))
+
+        # The capture thread reads into a ring of reused buffers; only the newest frame is ever handed out
+        self.ring: List[Optional[np.ndarray]] = self._allocate_ring(video_config.get('ring_size', 3))
+        self.latest_index: int = -1
+        self.sequence: int = 0
+        self.timestamp: float = 0
+        self.last_sequence: int = 0 # Newest frame returned by capture_frame/capture_encoded_frame
+        self.dropped_frames: int = 0
+        self.running: bool = True
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
+        self.start()
 
     def _set_camera_properties(self, video_config: dict) -> None:
         """Sets camera properties."""
@@ -22,6 +44,8 @@ class OpenCVCameraService:
         self.video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, video_config.get('image_height', 480))
         self.video_capture.set(cv2.CAP_PROP_FPS, video_config.get('frame_rate', 30))
         self.video_capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*video_config.get('fourcc', 'MJPG')))
+        if self.raw_mjpeg:
+            self.video_capture.set(cv2.CAP_PROP_CONVERT_RGB, 0)
 
         # User Controls
         self.video_capture.set(cv2.CAP_PROP_BRIGHTNESS, 128) # Brightness
@@ -39,6 +63,9 @@ class OpenCVCameraService:
         self.video_capture.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1) # Auto exposure (1 = manual mode)
         self.video_capture.set(cv2.CAP_PROP_EXPOSURE, 250)    # Exposure time absolute
 
+        # Frames are drained by the capture thread, so the driver only needs to hold the one being filled
+        self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, video_config.get('buffer_size', 1))
+
         # Store actual camera properties
         self.frame_rate: int = int(self.video_capture.get(cv2.CAP_PROP_FPS))
 
@@ -49,25 +76,107 @@ class OpenCVCameraService:
 
 
     def _calculate_fps(self) -> None:
-        """Calculate frame rate."""
+        """Calculate the current frame rate over the last few frames."""
         self.frame_count += 1
-        elapsed_time: float = time.time() - self.start_time
-        if elapsed_time > 0:
-            self.fps = self.frame_count / elapsed_time
+        self.fps = self.fps_meter.tick()
  
+    def _is_encoded(self, frame: np.ndarray) -> bool:
+        """Whether the backend returned compressed MJPEG data rather than a decoded image."""
+        if self.raw_mjpeg and frame.ndim == 3:
+            # Some backends ignore CAP_PROP_CONVERT_RGB and always decode
+            self.raw_mjpeg = False
+        return self.raw_mjpeg
+
+    def _allocate_ring(self, ring_size: int) -> List[Optional[np.ndarray]]:
+        """Preallocate the capture buffers; compressed frames vary in size, so those are allocated by the first reads."""
+        if self.raw_mjpeg:
+            return [None] * max(ring_size, 2)
+        height = int(self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        width = int(self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        return [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(ring_size, 2))]
+
+    def _capture_loop(self) -> None:
+        """Continuously read frames into the ring so the newest frame is always ready."""
+        while self.running:
+            # The slot after the latest is never being read: readers hold the lock, which blocks publishing
+            index = (self.latest_index + 1) % len(self.ring)
+            ret, frame = self.video_capture.read(self.ring[index])
+            if not ret:
+                if self.running:
+                    print("Error: Failed to capture image.")
+                    time.sleep(0.1)
+                continue
+
+            with self.frame_ready:
+                self.ring[index] = frame # Keeps any buffer OpenCV had to reallocate
+                self.latest_index = index
+                self.sequence += 1
+                self.timestamp = time.time()
+                self._calculate_fps()
+                self.frame_ready.notify_all()
+
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+
+    def _wait_for_new_frame(self, timeout: float) -> bool:
+        """Wait (holding the lock) for a frame newer than the last one consumed, dropping any frames skipped over."""
+        if not self.frame_ready.wait_for(lambda: self.sequence > self.last_sequence or not self.running, timeout):
+            return False
+        if self.sequence <= self.last_sequence:
+            return False
+        if self.last_sequence > 0:
+            self.dropped_frames += self.sequence - self.last_sequence - 1
+        self.last_sequence = self.sequence
+        return True
+
+    def get_latest_frame(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """Return a copy of the newest captured frame (still compressed in raw_mjpeg mode) with its sequence number and timestamp, without waiting."""
+        with self.frame_ready:
+            if self.latest_index < 0:
+                return None, 0, 0
+            return self.ring[self.latest_index].copy(), self.sequence, self.timestamp
+
     def capture_frame(self) -> np.ndarray:
-        """Capture a frame from the camera using opencv."""
-        ret, frame = self.video_capture.read()
-        if not ret:
-            print("Error: Failed to capture image.")
-            # Return an empty ndarray with the expected shape
-            return np.empty((0, 0, 3), dtype=np.uint8)
-        
-        frame = cv2.flip(frame, 1)
-        self._calculate_fps()
-        return frame
+        """Return the newest frame from the capture thread, waiting for one that has not been returned yet."""
+        with self.frame_ready:
+            if not self._wait_for_new_frame(timeout=1.0):
+                print("Error: Failed to capture image.")
+                # Return an empty ndarray with the expected shape
+                return EMPTY_FRAME
+            frame = self.ring[self.latest_index]
+            if not self._is_encoded(frame):
+                return cv2.flip(frame, 1)
+            jpeg = frame.tobytes()
+
+        # Decode outside the lock so the capture thread is not held up
+        frame = decode_image(jpeg)
+        if frame.size == 0:
+            return frame
+        return cv2.flip(frame, 1)
+
+    def capture_encoded_frame(self) -> bytes:
+        """Return the newest frame as JPEG, passing the camera's MJPEG data through untouched when possible."""
+        with self.frame_ready:
+            if not self._wait_for_new_frame(timeout=1.0):
+                print("Error: Failed to capture image.")
+                return b''
+            frame = self.ring[self.latest_index]
+            if self._is_encoded(frame):
+                return frame.tobytes()
+            frame = frame.copy()
+
+        ret, encoded_data = encode_image(frame)
+        return encoded_data.tobytes() if ret else b''
+
+    def start(self) -> None:
+        """Start the capture thread."""
+        self.thread = threading.Thread(target=self._capture_loop)
+        self.thread.daemon = True
+        self.thread.start()
 
     def release_resources(self) -> None:
         """Release camera resources."""
+        self.running = False
+        self.thread.join()
         self.video_capture.release()
         cv2.destroyAllWindows()
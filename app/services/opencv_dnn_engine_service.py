@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.utils.yolo_utils import detect_letterboxed
+
+
+class OpenCVDNNEngineService(DetectionEngineInterface):
+    def __init__(self, path: str, names: Dict[int, str], image_size: int = 640, min_confidence: float = 0.25, iou_threshold: float = 0.45):
+        self.name: str = 'opencv_dnn'
+        self.net: cv2.dnn.Net = cv2.dnn.readNetFromONNX(path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.names: Dict[int, str] = names
+        self.image_size: int = image_size
+        self.min_confidence: float = min_confidence
+        self.iou_threshold: float = iou_threshold
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Raw forward pass on an NCHW blob."""
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def infer(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Runs the ONNX model on an RGB frame with OpenCV's DNN module."""
+        return self.infer_batch([rgb_frame])[0]
+
+    def infer_batch(self, rgb_frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Runs the ONNX model on several RGB frames as one batch with OpenCV's DNN module."""
+        return detect_letterboxed(rgb_frames, self.image_size, self._forward, self.min_confidence, self.iou_threshold)
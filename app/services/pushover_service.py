@@ -1,24 +1,38 @@
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.interfaces.notification_interface import NotificationInterface
 
+PUSHOVER_URL: str = "https://api.pushover.net/1/messages.json"
+
 
 class PushoverService(NotificationInterface):
-    def __init__(self, api_token: str, user_key: str):
+    def __init__(self, api_token: str, user_key: str, url: str = PUSHOVER_URL, timeout: float = 5.0):
         self.api_token: str = api_token
         self.user_key: str = user_key
+        self.url: str = url or PUSHOVER_URL # Can point at a local stand-in server for testing
+        self.timeout: float = timeout
+
+        # Reuse connections (and TLS sessions) across notifications
+        self.session: requests.Session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=2))
 
-    def send_notification(self, message: str) -> None:
+    def send_notification(self, message: str, source: str = 'default') -> None:
+        """Send a push notification, raising requests.RequestException if it could not be delivered (worth retrying) or ValueError if it was rejected."""
         print(message)
-        url: str = "https://api.pushover.net/1/messages.json"
         data: dict = {
             "token": self.api_token,
             "user": self.user_key,
             "message": message
         }
-        response = requests.post(url, data=data)
+        response = self.session.post(self.url, data=data, timeout=self.timeout)
         if response.status_code == 200:
             print("Notification sent successfully!")
-        else:
-            print(f"Failed to send notification: {response.status_code}")
-            print(response.text)
+            return
+        print(f"Failed to send notification: {response.status_code}")
+        print(response.text)
+        if 400 <= response.status_code < 500:
+            # A bad token, user key or message fails the same way every time
+            raise ValueError(f"Notification rejected: {response.status_code}")
+        response.raise_for_status()
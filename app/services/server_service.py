@@ -1,76 +1,178 @@
-from typing import Any, Generator
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Generator, Optional
 
-import numpy as np
 from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import (HTMLResponse, JSONResponse, PlainTextResponse,
+                               RedirectResponse, Response, StreamingResponse)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from app.interfaces.camera_interface import CameraInterface
-from app.interfaces.detector_interface import DetectorInterface
+from app.interfaces.batch_scheduler_interface import BatchSchedulerInterface
+from app.interfaces.camera_pipeline_interface import CameraPipelineInterface
+from app.interfaces.executor_interface import ExecutorInterface
+from app.interfaces.metrics_interface import MetricsInterface
+from app.interfaces.notification_dispatcher_interface import \
+    NotificationDispatcherInterface
 from app.interfaces.server_interface import ServerInterface
-from app.interfaces.state_manager_interface import StateManagerInterface
-from app.utils.opencv_utils import encode_image
+from app.services.clip_recorder_service import CLIP_MEDIA_TYPES
+from app.utils.http_utils import iter_file_range, parse_byte_range
+from app.utils.stream_utils import MULTIPART_MEDIA_TYPE
+
+MIN_THRESHOLD_SECONDS: float = 1
+MAX_THRESHOLD_SECONDS: float = 20
 
 
 class ServerService(ServerInterface):
-    def __init__(self, config: dict, camera_service: CameraInterface, state_manager_service: StateManagerInterface, detector_service: DetectorInterface):
-        self.app = FastAPI()
-        self.camera_service: CameraInterface = camera_service
-        self.state_manager_service: StateManagerInterface = state_manager_service
-        self.detector_service: DetectorInterface = detector_service
+    def __init__(self, config: dict, pipelines: Dict[str, CameraPipelineInterface], executor: ExecutorInterface,
+                 notification_dispatcher: NotificationDispatcherInterface, metrics: MetricsInterface,
+                 batch_scheduler: Optional[BatchSchedulerInterface] = None):
+        self.app = FastAPI(lifespan=self.lifespan)
+        self.executor: ExecutorInterface = executor
+        self.notification_dispatcher: NotificationDispatcherInterface = notification_dispatcher
+        self.metrics: MetricsInterface = metrics
+        self.batch_scheduler: Optional[BatchSchedulerInterface] = batch_scheduler # Shared by the cameras, closed once they stop
+        self.pipelines: Dict[str, CameraPipelineInterface] = pipelines
+        self.default_camera_id: str = next(iter(pipelines))
         self.server_config: dict = config['server']
-        self.video_config: dict = config['video']
-        self.frame_rate: int = self.camera_service.frame_rate
         self.templates: Jinja2Templates = Jinja2Templates(directory="templates")
         self.app.mount('/static', StaticFiles(directory='static'), name='static')
 
         self.app.add_api_route("/video_feed", self.video_feed)
+        self.app.add_api_route("/video_feed/{camera_id}", self.video_feed)
         self.app.add_api_route("/", self.index, methods=["GET"])
         self.app.add_api_route("/update_threshold", self.update_threshold, methods=["POST"])
+        self.app.add_api_route("/overlay", self.overlay, methods=["GET"])
+        self.app.add_api_route("/overlay/{camera_id}", self.overlay, methods=["GET"])
+        self.app.add_api_route("/stats", self.stats, methods=["GET"])
+        self.app.add_api_route("/metrics", self.metrics_endpoint, methods=["GET"])
+        self.app.add_api_route("/clips", self.clips, methods=["GET"])
+        self.app.add_api_route("/clips/{camera_id}/{name}", self.clip, methods=["GET"])
 
         self.running = True
 
-    async def video_feed(self) -> StreamingResponse:
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        """Runs every camera's monitoring loop for the lifetime of the server."""
+        self.executor.start()
+        self.notification_dispatcher.start()
+        for pipeline in self.pipelines.values():
+            pipeline.start()
+        try:
+            yield
+        finally:
+            self.running = False
+            for pipeline in self.pipelines.values():
+                await pipeline.stop()
+            if self.batch_scheduler is not None:
+                await self.batch_scheduler.close()
+            await self.notification_dispatcher.stop()
+            await self.executor.stop()
+
+    def _get_pipeline(self, camera_id: str) -> CameraPipelineInterface:
+        """Look up a camera's pipeline, defaulting to the first camera."""
+        pipeline = self.pipelines.get(camera_id or self.default_camera_id)
+        if pipeline is None:
+            raise HTTPException(status_code=404, detail=f"Unknown camera: {camera_id}")
+        return pipeline
+
+    async def video_feed(self, camera_id: str = '') -> StreamingResponse:
         """Video feed page of the server."""
-        return StreamingResponse(self.serve_frame(),
-                                 media_type='multipart/x-mixed-replace; boundary=frame')
+        return StreamingResponse(self.serve_frame(self._get_pipeline(camera_id)), media_type=MULTIPART_MEDIA_TYPE)
 
     async def index(self, request: Request) -> HTMLResponse:
         """Main page of server."""
         return self.templates.TemplateResponse("index.html",
                                                {"request": request,
-                                                "image_width": self.video_config.get('image_width', 640),
-                                                "image_height": self.video_config.get('image_height', 480),
-                                                "current_threshold": self.state_manager_service.max_no_face_count})
+                                                "cameras": [{"id": camera_id,
+                                                             "image_width": pipeline.video_config.get('image_width', 640),
+                                                             "image_height": pipeline.video_config.get('image_height', 480),
+                                                             "stream_mode": pipeline.video_config.get('stream_mode', 'annotated')}
+                                                            for camera_id, pipeline in self.pipelines.items()],
+                                                "current_threshold": self._get_pipeline('').state_manager_service.max_no_face_time,
+                                                "min_threshold": MIN_THRESHOLD_SECONDS,
+                                                "max_threshold": MAX_THRESHOLD_SECONDS})
 
-    async def update_threshold(self, threshold: int = Form(...)) -> RedirectResponse:
-        """Updates the notification threshold (number of frames) for detections."""
-        # Calculate bounds based on frame_rate
-        min_threshold: int = self.frame_rate * 1 if self.frame_rate else 5 # Minimum of 1 second
-        max_threshold: int = self.frame_rate * 20 if self.frame_rate else 100 # Maximum of 20 seconds
+    async def overlay(self, camera_id: str = '') -> JSONResponse:
+        """Latest detections and state for drawing over the passthrough stream."""
+        return JSONResponse(self._get_pipeline(camera_id).detector_service.get_overlay())
 
-        # Ensure the threshold is within bounds
-        if threshold < min_threshold or threshold > max_threshold:
-            raise HTTPException(status_code=400, detail=f"Threshold must be between {min_threshold} and {max_threshold} frames.")
+    async def stats(self) -> JSONResponse:
+        """Event loop lag, worker pool usage, notification counts and each camera's state dwell times."""
+        cameras = {camera_id: {'state': pipeline.state_manager_service.get_state().get_annotation(),
+                               'dwell_time': round(pipeline.state_manager_service.get_dwell_time(), 1),
+                               'dwell_times': {state: round(seconds, 1) for state, seconds in pipeline.state_manager_service.get_dwell_times().items()}}
+                   for camera_id, pipeline in self.pipelines.items()}
+        return JSONResponse({**self.executor.get_metrics(), 'notifications': self.notification_dispatcher.get_metrics(), 'cameras': cameras})
+
+    async def metrics_endpoint(self) -> PlainTextResponse:
+        """Stage latencies, frame rates and service gauges in the Prometheus text format."""
+        for camera_id, pipeline in self.pipelines.items():
+            self.metrics.set_gauge('camera_fps', "Frame rate delivered by the camera.", pipeline.camera_service.fps, source=camera_id)
+            self.metrics.set_gauge('viewers', "Clients watching the video feed.", pipeline.frame_hub.subscriber_count, source=camera_id)
+        executor_metrics = self.executor.get_metrics()
+        self.metrics.set_gauge('event_loop_lag_seconds', "How late the last event loop timer fired.", executor_metrics['loop_lag_ms'] / 1000)
+        for pool in ('inference', 'encoding'):
+            self.metrics.set_gauge('pool_pending_jobs', "Jobs queued or running on a worker pool.", executor_metrics[f'{pool}_pending'], pool=pool)
+        for outcome, count in self.notification_dispatcher.get_metrics().items():
+            self.metrics.set_gauge('notifications', "Notifications by outcome.", count, outcome=outcome)
+        return PlainTextResponse(self.metrics.render(), media_type='text/plain; version=0.0.4')
+
+    async def clips(self) -> JSONResponse:
+        """Each camera's saved alert clips, newest first, with their download URLs."""
+        clips = {camera_id: [{**clip, 'url': f"/clips/{camera_id}/{clip['name']}"} for clip in pipeline.clip_recorder.list_clips()]
+                 for camera_id, pipeline in self.pipelines.items() if pipeline.clip_recorder is not None}
+        return JSONResponse(clips)
+
+    async def clip(self, request: Request, camera_id: str, name: str) -> Response:
+        """Download a saved clip, honouring Range requests so players can seek."""
+        clip_recorder = self._get_pipeline(camera_id).clip_recorder
+        path = clip_recorder.get_clip_path(name) if clip_recorder is not None else ''
+        if not path:
+            raise HTTPException(status_code=404, detail=f"Unknown clip: {name}")
 
         try:
-            self.state_manager_service.max_no_face_count = threshold
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid threshold value")
+            # Opened up front so a clip rotated away after the lookup is a 404, and one rotated away mid-download still streams
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Unknown clip: {name}")
+        size = os.fstat(f.fileno()).st_size
+        headers = {'Accept-Ranges': 'bytes'}
+        media_type = CLIP_MEDIA_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream')
+        byte_range = parse_byte_range(request.headers.get('range', ''), size)
+        if byte_range is None:
+            # Streamed the same way rather than through FileResponse, which (in newer Starlette) parses Range itself
+            return StreamingResponse(iter_file_range(f, 0, size - 1), media_type=media_type, headers={**headers, 'Content-Length': str(size)})
+
+        start, end = byte_range
+        if start >= size:
+            f.close()
+            return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+        # Browsers usually open with 'bytes=0-', so the range is streamed from disk (a sync iterator runs on a worker thread)
+        return StreamingResponse(iter_file_range(f, start, end), status_code=206, media_type=media_type,
+                                 headers={**headers, 'Content-Range': f'bytes {start}-{end}/{size}', 'Content-Length': str(end - start + 1)})
+
+    async def update_threshold(self, threshold: float = Form(...)) -> RedirectResponse:
+        """Updates the notification threshold (seconds without a face) on every camera."""
+        # Ensure the threshold is within bounds
+        if threshold < MIN_THRESHOLD_SECONDS or threshold > MAX_THRESHOLD_SECONDS:
+            raise HTTPException(status_code=400, detail=f"Threshold must be between {MIN_THRESHOLD_SECONDS} and {MAX_THRESHOLD_SECONDS} seconds.")
+
+        for pipeline in self.pipelines.values():
+            pipeline.state_manager_service.max_no_face_time = threshold
 
         return RedirectResponse(url='/', status_code=303)
 
-    async def serve_frame(self) -> Generator[Any, Any, Any]:
-        """Serve a frame to the video server."""
-        while self.running:
-            frame = await self.detector_service.process_frame()
-            if frame.size == 0:
-                continue
-            ret, encoded_data = encode_image(frame)
-            if ret:
-                byte_data = encoded_data.tobytes()
-                yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + byte_data + b'\r\n')
+    async def serve_frame(self, pipeline: CameraPipelineInterface) -> Generator[Any, Any, Any]:
+        """Serve a camera's frames to the video server."""
+        async for sequence, frame in pipeline.frame_hub.subscribe():
+            if not self.running:
+                break
+            chunk = await pipeline.frame_hub.get_chunk(sequence, frame)
+            if chunk is not None:
+                # Resumes once the chunk has been handed to the client, so slow viewers show up as send time
+                with self.metrics.time('send', pipeline.camera_id):
+                    yield chunk
 
     def run(self) -> None:
         """Runs the FastAPI server with uvicorn."""
@@ -1,24 +1,117 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
 from app.interfaces.notification_interface import NotificationInterface
 from app.interfaces.state_manager_interface import StateManagerInterface
-from app.states.state_classes import IdleState, State
+from app.states.state_classes import (IDLE, NO_FACE_DETECTED, STATES,
+                                      TRANSITIONS, CountAction, State)
 
 
 class StateManagerService(StateManagerInterface):
-    def __init__(self, config: dict, notification_service: NotificationInterface):
-        self.state: State = IdleState(self)
-        self.no_face_count: int = 0
-        self.max_no_face_count: int = config['threshold'].get('detection_threshold', 100)
+    def __init__(self, config: dict, notification_service: NotificationInterface, source: str = 'default'):
+        threshold_config: dict = config['threshold']
+        self.state: State = IDLE
+        # Time a person has been seen without a face, so the alert delay does not depend on the detection rate
+        self.no_face_time: float = 0
+        if 'no_face_seconds' in threshold_config:
+            self.max_no_face_time: float = threshold_config['no_face_seconds']
+        else:
+            # Older configs give the threshold in camera frames
+            self.max_no_face_time = threshold_config.get('detection_threshold', 100) / config.get('video', {}).get('frame_rate', 30)
+        # A gap between detections counts in full unless it is well above the usual detection interval, in which case it
+        # is treated as a stall (a frozen camera or process) and only counts stall_intervals intervals, so a stall cannot
+        # trigger an alert by itself while slow detection (idle cadence, CPU load shedding) still alerts on time
+        self.stall_intervals: float = threshold_config.get('stall_intervals', 4)
+        idle_fps: float = config.get('monitor', {}).get('idle_fps', 2)
+        self.expected_gap: float = 1 / idle_fps if idle_fps > 0 else 1.0 # The slowest cadence the monitor runs at on purpose
+        self.typical_gap: float = self.expected_gap # Moving average of recent (capped) gaps, which grows when detection slows down
+        self.max_event_gap: Optional[float] = threshold_config.get('max_event_gap') # Fixed cap instead of the derived one
+        self.last_timestamp: Optional[float] = None
         self.notification_service: NotificationInterface = notification_service
+        self.source: str = source # Camera the alerts come from, so cameras sharing a message do not suppress each other
         self.message: str = config['notification'].get('MESSAGE', 'No message provided!')
 
+        # K-of-N smoothing: a person/face counts as present when seen in person_hits/face_hits of the last smoothing_frames detections
+        smoothing_frames: int = max(1, threshold_config.get('smoothing_frames', 1)) # 0 would leave no room for the latest detection
+        self.person_hits: int = threshold_config.get('person_hits', 1)
+        self.face_hits: int = threshold_config.get('face_hits', 1)
+        self.smoothing_max_age: float = threshold_config.get('smoothing_max_age', 2.0) # Older detections drop out of the window
+        self.window: Deque[Tuple[float, bool, bool]] = deque(maxlen=smoothing_frames)
+        self.window_persons: int = 0
+        self.window_faces: int = 0
+
+        # Time spent in each state, indexed by StateId; the current stay is added when it ends
+        self.state_entered: float = time.monotonic()
+        self.dwell_totals: List[float] = [0.0] * len(STATES)
+
     def set_state(self, state: State) -> None:
         """Set a new state."""
+        if state is self.state:
+            return
+        now = time.monotonic()
+        self.dwell_totals[self.state.id] += now - self.state_entered
+        self.state_entered = now
         self.state = state
 
-    def process_frame(self, person_detected: bool, face_detected: bool) -> None:
-        """Delegate frame processing to the current state."""
-        self.state.process_frame(person_detected, face_detected)
+    def _drop_oldest(self) -> None:
+        """Remove the oldest detection from the smoothing window."""
+        _, person_detected, face_detected = self.window.popleft()
+        self.window_persons -= person_detected
+        self.window_faces -= face_detected
+
+    def _smooth(self, person_detected: bool, face_detected: bool, timestamp: float) -> Tuple[bool, bool]:
+        """Apply K-of-N smoothing over the recent detections."""
+        if len(self.window) == self.window.maxlen:
+            self._drop_oldest()
+        while self.window and timestamp - self.window[0][0] > self.smoothing_max_age:
+            self._drop_oldest()
+        self.window.append((timestamp, person_detected, face_detected))
+        self.window_persons += person_detected
+        self.window_faces += face_detected
+
+        # After a pause in detection the window holds fewer than N detections, so K is capped to what is there
+        size = len(self.window)
+        return self.window_persons >= min(self.person_hits, size), self.window_faces >= min(self.face_hits, size)
+
+    def process_frame(self, person_detected: bool, face_detected: bool, timestamp: Optional[float] = None) -> None:
+        """Advance the state machine by one detection result, taken at timestamp (time.monotonic() seconds)."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        elapsed = 0.0
+        if self.last_timestamp is not None:
+            elapsed = min(max(timestamp - self.last_timestamp, 0), self.get_max_event_gap())
+            self.typical_gap += 0.2 * (elapsed - self.typical_gap)
+        self.last_timestamp = timestamp
+        person_detected, face_detected = self._smooth(person_detected, face_detected, timestamp)
+
+        next_state, count_action = TRANSITIONS[self.state.id][person_detected][face_detected]
+        if count_action == CountAction.INCREMENT:
+            self.no_face_time += elapsed
+            if self.no_face_time >= self.max_no_face_time:
+                self.set_state(NO_FACE_DETECTED)
+                self.notification_service.send_notification(self.message, self.source)
+                return
+        elif count_action == CountAction.RESET:
+            self.no_face_time = 0
+        self.set_state(STATES[next_state])
+
+    def get_max_event_gap(self) -> float:
+        """Longest gap between detections that counts in full toward the no face time."""
+        if self.max_event_gap is not None:
+            return self.max_event_gap
+        return self.stall_intervals * max(self.expected_gap, self.typical_gap)
 
     def get_state(self) -> State:
         """Get the current state."""
         return self.state
+
+    def get_dwell_time(self) -> float:
+        """Seconds spent in the current state so far."""
+        return time.monotonic() - self.state_entered
+
+    def get_dwell_times(self) -> Dict[str, float]:
+        """Total seconds spent in each state, including the current stay."""
+        dwell_times = {state.get_annotation(): self.dwell_totals[state.id] for state in STATES}
+        dwell_times[self.state.get_annotation()] += self.get_dwell_time()
+        return dwell_times
@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.interfaces.tracker_interface import TrackerInterface
+
+
+class TemplateTrackerService(TrackerInterface):
+    def __init__(self, search_margin: float = 0.5, min_score: float = 0.5, min_size: int = 4):
+        self.search_margin: float = search_margin # Search window around the last position, relative to box size
+        self.min_score: float = min_score         # Boxes matching worse than this are considered lost
+        self.min_size: int = min_size             # Templates smaller than this (in pixels) are not tracked
+        self.frame_scale: float = 1.0
+        # A box that is lost (or too small to track) keeps its last position until the next keyframe, rather than
+        # disappearing and counting as no face
+        self.templates: List[Optional[np.ndarray]] = []
+        self.positions: List[Tuple[int, int]] = []
+        self.bboxes: List[Tuple[int, int, int, int]] = [] # Last known box, in full resolution coordinates
+
+    def init(self, gray_frame: np.ndarray, bboxes: np.ndarray, frame_scale: float) -> None:
+        """Start tracking full resolution bboxes in a grayscale frame scaled by frame_scale."""
+        height, width = gray_frame.shape[:2]
+        self.frame_scale = frame_scale
+        self.templates = []
+        self.positions = []
+        self.bboxes = []
+        for top, right, bottom, left in bboxes:
+            y0, y1 = max(int(top * frame_scale), 0), min(int(bottom * frame_scale), height)
+            x0, x1 = max(int(left * frame_scale), 0), min(int(right * frame_scale), width)
+            too_small = y1 - y0 < self.min_size or x1 - x0 < self.min_size
+            self.templates.append(None if too_small else gray_frame[y0:y1, x0:x1].copy())
+            self.positions.append((y0, x0))
+            self.bboxes.append((int(top), int(right), int(bottom), int(left)))
+
+    def _match(self, gray_frame: np.ndarray, template: np.ndarray, y: int, x: int) -> Optional[Tuple[int, int]]:
+        """New position of a template searched for around (y, x), or None if it was not found."""
+        height, width = gray_frame.shape[:2]
+        template_height, template_width = template.shape
+        margin_y = int(template_height * self.search_margin)
+        margin_x = int(template_width * self.search_margin)
+        y0, y1 = max(y - margin_y, 0), min(y + template_height + margin_y, height)
+        x0, x1 = max(x - margin_x, 0), min(x + template_width + margin_x, width)
+        if y1 - y0 < template_height or x1 - x0 < template_width:
+            return None
+
+        result = cv2.matchTemplate(gray_frame[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (dx, dy) = cv2.minMaxLoc(result)
+        if score < self.min_score:
+            return None
+        return y0 + dy, x0 + dx
+
+    def update(self, gray_frame: np.ndarray) -> np.ndarray:
+        """Returns the tracked bboxes, in full resolution coordinates, for the next frame."""
+        for index, template in enumerate(self.templates):
+            if template is None:
+                continue
+            position = self._match(gray_frame, template, *self.positions[index])
+            if position is None:
+                continue
+
+            y, x = position
+            template_height, template_width = template.shape
+            self.positions[index] = position
+            self.bboxes[index] = tuple(int(value / self.frame_scale) for value in (y, x + template_width, y + template_height, x))
+
+        return np.asarray(self.bboxes, dtype=np.int32).reshape(-1, 4)
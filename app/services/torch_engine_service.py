@@ -0,0 +1,21 @@
+from typing import Dict, List
+
+import numpy as np
+from torch.nn import Module
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+
+
+class TorchEngineService(DetectionEngineInterface):
+    def __init__(self, hub_model: Module):
+        self.name: str = 'torch'
+        self.model: Module = hub_model
+        self.names: Dict[int, str] = hub_model.names
+
+    def infer(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Runs the eager PyTorch hub model, which handles letterboxing and NMS itself."""
+        return self.model(rgb_frame).xyxy[0].cpu().numpy()
+
+    def infer_batch(self, rgb_frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Runs the eager PyTorch hub model on several RGB frames as one batch."""
+        return [detections.cpu().numpy() for detections in self.model(rgb_frames).xyxy]
@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+from app.utils.yolo_utils import detect_letterboxed
+
+
+class TorchScriptEngineService(DetectionEngineInterface):
+    def __init__(self, path: str, names: Dict[int, str], image_size: int = 640, min_confidence: float = 0.25, iou_threshold: float = 0.45):
+        self.name: str = 'torchscript'
+        self.model: torch.jit.ScriptModule = torch.jit.load(path, map_location='cpu').eval()
+        self.names: Dict[int, str] = names
+        self.image_size: int = image_size
+        self.min_confidence: float = min_confidence
+        self.iou_threshold: float = iou_threshold
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Raw forward pass on an NCHW blob."""
+        with torch.no_grad():
+            prediction = self.model(torch.from_numpy(blob))
+        return (prediction[0] if isinstance(prediction, (list, tuple)) else prediction).numpy()
+
+    def infer(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """Runs the TorchScript model on an RGB frame."""
+        return self.infer_batch([rgb_frame])[0]
+
+    def infer_batch(self, rgb_frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Runs the TorchScript model on several RGB frames as one batch."""
+        return detect_letterboxed(rgb_frames, self.image_size, self._forward, self.min_confidence, self.iou_threshold)
@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+import time
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+
+from app.interfaces.trace_recorder_interface import TraceRecorderInterface
+from app.utils.trace_utils import (BOXES_EXTENSION, FRAMES_EXTENSION,
+                                   TRACE_FRAME_STRUCT, encode_boxes)
+
+
+class TraceRecorderService(TraceRecorderInterface):
+    def __init__(self, trace_config: dict, source: str = 'default'):
+        directory = os.path.join(trace_config.get('directory', 'traces'), source)
+        os.makedirs(directory, exist_ok=True)
+        # One trace per run, named after its wall clock start since the timestamps inside are monotonic
+        self.frames_path: str = ''
+        self.boxes_path: str = ''
+        frames_file, boxes_file = self._create_trace(os.path.join(directory, time.strftime('%Y%m%d-%H%M%S')))
+
+        # Records collect in memory and are written by a background thread, so the frame loop never waits on disk
+        self.buffer_bytes: int = trace_config.get('buffer_bytes', 1 << 16)
+        self.flush_interval: float = trace_config.get('flush_interval', 10.0) # Seconds between writes even when the buffer is not full
+        self.frame_buffer: bytearray = bytearray()
+        self.box_buffer: bytearray = bytearray()
+        self.last_flush: float = time.monotonic()
+        self.write_queue: queue.Queue[Optional[Tuple[bytes, bytes]]] = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop, args=(frames_file, boxes_file), daemon=True)
+        self.thread.start()
+
+    def _create_trace(self, base_path: str) -> Tuple[BinaryIO, BinaryIO]:
+        """Create a new pair of trace files, numbering the name when another run started in the same second."""
+        index = 0
+        while True:
+            path = base_path if index == 0 else f'{base_path}-{index}'
+            index += 1
+            try:
+                # Exclusive creation, so two recorders (or a quick restart) never append to the same trace
+                frames_file = open(path + FRAMES_EXTENSION, 'xb')
+            except FileExistsError:
+                continue
+            try:
+                boxes_file = open(path + BOXES_EXTENSION, 'xb')
+            except FileExistsError:
+                frames_file.close()
+                os.remove(path + FRAMES_EXTENSION)
+                continue
+            self.frames_path, self.boxes_path = path + FRAMES_EXTENSION, path + BOXES_EXTENSION
+            return frames_file, boxes_file
+
+    def record(self, timestamp: float, state: int, person_bboxes: np.ndarray, face_bboxes: np.ndarray) -> None:
+        """Append one frame's detections and resulting state to the trace."""
+        self.frame_buffer += TRACE_FRAME_STRUCT.pack(timestamp, state, len(person_bboxes), len(face_bboxes))
+        if len(person_bboxes) or len(face_bboxes):
+            self.box_buffer += encode_boxes(person_bboxes)
+            self.box_buffer += encode_boxes(face_bboxes)
+
+        if len(self.frame_buffer) + len(self.box_buffer) >= self.buffer_bytes or timestamp - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand buffered records to the writer thread."""
+        if self.frame_buffer:
+            self.write_queue.put((bytes(self.frame_buffer), bytes(self.box_buffer)))
+            self.frame_buffer.clear()
+            self.box_buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def _write_loop(self, frames_file: BinaryIO, boxes_file: BinaryIO) -> None:
+        """Append buffered records to the trace files until close() is called."""
+        with frames_file, boxes_file:
+            while True:
+                chunk = self.write_queue.get()
+                if chunk is None:
+                    return
+                frames, boxes = chunk
+                # Boxes first, so a frame record never refers to boxes that are not on disk yet
+                boxes_file.write(boxes)
+                boxes_file.flush()
+                frames_file.write(frames)
+                frames_file.flush()
+
+    def close(self) -> None:
+        """Write out everything recorded and stop the writer thread."""
+        self.flush()
+        self.write_queue.put(None)
+        self.thread.join()
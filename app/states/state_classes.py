@@ -1,75 +1,64 @@
-from abc import ABC, abstractmethod
+from enum import IntEnum
+from typing import Tuple
 
 from app.utils.constants import BLUE, GREEN, RED, WHITE
 
 
-class State(ABC):
-    def __init__(self, state_manager):
-        self.state_manager = state_manager
+class StateId(IntEnum):
+    IDLE = 0
+    PERSON_DETECTED = 1
+    FACE_DETECTED = 2
+    NO_FACE_DETECTED = 3
 
-    @abstractmethod
-    def process_frame(self, person_detected: bool, face_detected: bool):
-        pass
 
-    @abstractmethod
-    def get_annotation(self) -> str:
-        pass
+class CountAction(IntEnum):
+    """What a transition does to the state manager's no-face timer."""
+    KEEP = 0
+    INCREMENT = 1 # Switches to NO_FACE_DETECTED (and notifies) instead once the timer reaches the threshold
+    RESET = 2
 
-    @abstractmethod
-    def get_color(self) -> tuple:
-        pass
 
-class IdleState(State):
-    def process_frame(self, person_detected: bool, face_detected: bool):
-        if person_detected:
-            self.state_manager.set_state(PersonDetectedState(self.state_manager))
-    
+class State:
+    """Immutable description of a state; there is exactly one instance per StateId."""
+    __slots__ = ('id', 'annotation', 'color')
+
+    def __init__(self, state_id: StateId, annotation: str, color: Tuple[int, int, int]):
+        self.id: StateId = state_id
+        self.annotation: str = annotation
+        self.color: Tuple[int, int, int] = color
+
     def get_annotation(self) -> str:
-        return "Idle"
-    
+        return self.annotation
+
     def get_color(self) -> tuple:
-        return WHITE
+        return self.color
+
+
+IDLE = State(StateId.IDLE, "Idle", WHITE)
+PERSON_DETECTED = State(StateId.PERSON_DETECTED, "Person", RED)
+FACE_DETECTED = State(StateId.FACE_DETECTED, "Face", GREEN)
+NO_FACE_DETECTED = State(StateId.NO_FACE_DETECTED, "Face Not Detected", BLUE)
+
+STATES: Tuple[State, ...] = (IDLE, PERSON_DETECTED, FACE_DETECTED, NO_FACE_DETECTED)
 
-class PersonDetectedState(State):
-    def process_frame(self, person_detected: bool, face_detected: bool):
+
+def _transition(state_id: StateId, person_detected: bool, face_detected: bool) -> Tuple[StateId, CountAction]:
+    """Next state and count action for one frame's detections (the rules the table is built from)."""
+    if state_id == StateId.IDLE:
+        return (StateId.PERSON_DETECTED if person_detected else StateId.IDLE), CountAction.KEEP
+    if state_id == StateId.PERSON_DETECTED:
         if face_detected:
-            self.state_manager.set_state(FaceDetectedState(self.state_manager))
-        else:
-            self.state_manager.no_face_count += 1
-            if self.state_manager.no_face_count >= self.state_manager.max_no_face_count:
-                self.state_manager.set_state(NoFaceDetectedState(self.state_manager))
-                self.state_manager.notification_service.send_notification(self.state_manager.message)
-            elif not person_detected:
-                self.state_manager.set_state(IdleState(self.state_manager))
-    
-    def get_annotation(self) -> str:
-        return "Person"
-    
-    def get_color(self) -> tuple:
-        return RED
+            return StateId.FACE_DETECTED, CountAction.KEEP
+        return (StateId.PERSON_DETECTED if person_detected else StateId.IDLE), CountAction.INCREMENT
+    if state_id == StateId.FACE_DETECTED:
+        return (StateId.FACE_DETECTED if face_detected else StateId.PERSON_DETECTED), CountAction.KEEP
+    if person_detected:
+        return (StateId.FACE_DETECTED if face_detected else StateId.PERSON_DETECTED), CountAction.RESET
+    return StateId.NO_FACE_DETECTED, CountAction.KEEP
 
-class FaceDetectedState(State):
-    def process_frame(self, person_detected: bool, face_detected: bool):
-        if not face_detected:
-            self.state_manager.set_state(PersonDetectedState(self.state_manager))
-    
-    def get_annotation(self) -> str:
-        return "Face"
-    
-    def get_color(self) -> tuple:
-        return GREEN
-
-class NoFaceDetectedState(State):
-    def process_frame(self, person_detected: bool, face_detected: bool):
-        if person_detected:
-            self.state_manager.no_face_count = 0
-            if face_detected:
-                self.state_manager.set_state(FaceDetectedState(self.state_manager))
-            else:
-                self.state_manager.set_state(PersonDetectedState(self.state_manager))
-    
-    def get_annotation(self) -> str:
-        return "Face Not Detected"
-    
-    def get_color(self) -> tuple:
-        return BLUE
+
+# TRANSITIONS[state][person_detected][face_detected] -> (next state, count action)
+TRANSITIONS: Tuple[Tuple[Tuple[Tuple[StateId, CountAction], ...], ...], ...] = tuple(
+    tuple(tuple(_transition(state_id, person, face) for face in (False, True)) for person in (False, True))
+    for state_id in StateId
+)
@@ -0,0 +1,31 @@
+""" Utility script for comparing detection engines """
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.interfaces.detection_engine_interface import DetectionEngineInterface
+
+
+def compare_engines(engines: List[DetectionEngineInterface], rgb_frames: List[np.ndarray], warmup: int = 3) -> Dict[str, Dict[str, float]]:
+    """Runs every engine on the same frames and reports per-frame latency (ms) and throughput."""
+    results: Dict[str, Dict[str, float]] = {}
+    for engine in engines:
+        for rgb_frame in rgb_frames[:warmup]:
+            engine.infer(rgb_frame)
+
+        latencies = []
+        detection_count = 0
+        for rgb_frame in rgb_frames:
+            start_time = time.perf_counter()
+            detections = engine.infer(rgb_frame)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            detection_count += len(detections)
+
+        latencies_ms = np.asarray(latencies)
+        results[engine.name] = {'mean_ms': float(latencies_ms.mean()),
+                                'p50_ms': float(np.percentile(latencies_ms, 50)),
+                                'p95_ms': float(np.percentile(latencies_ms, 95)),
+                                'fps': float(1000 / latencies_ms.mean()),
+                                'detections_per_frame': detection_count / len(rgb_frames)}
+    return results
@@ -0,0 +1,46 @@
+""" Utility script for serving byte ranges of files """
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+CHUNK_SIZE: int = 1 << 16
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' Range header into an inclusive (start, end) within size.
+
+    Returns None for a missing, invalid or multi-range header (serve the whole file), and (size, size) when the range cannot be satisfied.
+    """
+    if not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, _, end_text = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if start_text == '':
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                return size, size
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else None
+    except ValueError:
+        return None
+    if end is not None and end < start:
+        # Syntactically invalid, so it is ignored (RFC 7233 section 3.1)
+        return None
+    if end is None:
+        end = size - 1
+    if start >= size:
+        return size, size
+    return start, min(end, size - 1)
+
+
+def iter_file_range(f: BinaryIO, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes start to end (inclusive) of an open file, chunk_size at a time, so a large range is never held in memory. Closes the file when done."""
+    with f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,41 @@
+""" Utility script for latency and frame rate measurements """
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+
+class FpsMeter:
+    """Frame rate over the last window_size ticks, so it follows current throughput rather than the lifetime average."""
+
+    def __init__(self, window_size: int = 30):
+        self.ticks: Deque[float] = deque(maxlen=window_size)
+
+    def tick(self) -> float:
+        """Record a frame and return the current frame rate."""
+        self.ticks.append(time.monotonic())
+        return self.fps
+
+    @property
+    def fps(self) -> float:
+        """Frames per second over the window, dropping towards zero once ticks stop."""
+        if len(self.ticks) < 2:
+            return 0
+        elapsed = time.monotonic() - self.ticks[0]
+        return (len(self.ticks) - 1) / elapsed if elapsed > 0 else 0
+
+
+def escape_label_value(value: str) -> str:
+    """Escape backslashes, quotes and newlines as the Prometheus text format requires."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """Prometheus label set, e.g. {source="nursery",stage="yolo"}, or nothing when there are no labels."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Hashable, ordered form of a label set."""
+    return tuple(sorted(labels.items()))
@@ -0,0 +1,63 @@
+""" Utility script for splitting an MJPEG byte stream into JPEG frames """
+import io
+from typing import List
+
+SOI: bytes = b'\xff\xd8' # JPEG start of image marker
+EOI: bytes = b'\xff\xd9' # JPEG end of image marker
+
+
+class MJPEGSplitter:
+    """Incrementally splits a stream of concatenated JPEGs into complete frames."""
+
+    def __init__(self, chunk_size: int = 1 << 18):
+        self.chunk: bytearray = bytearray(chunk_size)
+        self.chunk_view: memoryview = memoryview(self.chunk)
+        self.buffer: bytearray = bytearray()
+        self.frame_start: int = -1 # Offset of the current frame's SOI, -1 while searching
+        self.scan_pos: int = 0     # Offset from which the next marker search resumes
+
+    def read_frames(self, stream: io.BufferedIOBase) -> List[bytes]:
+        """Read whatever the stream has available (up to one chunk) and return every frame it completes."""
+        # readinto would block until the whole chunk is filled, delaying frames and delivering them in bursts
+        bytes_read = stream.readinto1(self.chunk_view)
+        if not bytes_read:
+            raise EOFError("MJPEG stream closed")
+        self.buffer += self.chunk_view[:bytes_read]
+        return self._split()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Append data to the buffer and return every frame it completes."""
+        self.buffer += data
+        return self._split()
+
+    def _split(self) -> List[bytes]:
+        """Extract complete frames, only scanning bytes that have not been scanned before."""
+        frames: List[bytes] = []
+        buffer = self.buffer
+        while True:
+            if self.frame_start < 0:
+                start = buffer.find(SOI, self.scan_pos)
+                if start < 0:
+                    # Keep a trailing 0xFF in case it is the first half of a split marker
+                    self.scan_pos = max(len(buffer) - 1, 0)
+                    break
+                self.frame_start = start
+                self.scan_pos = start + len(SOI)
+
+            end = buffer.find(EOI, self.scan_pos)
+            if end < 0:
+                self.scan_pos = max(len(buffer) - 1, self.frame_start + len(SOI))
+                break
+            end += len(EOI)
+            frames.append(bytes(buffer[self.frame_start:end]))
+            self.frame_start = -1
+            self.scan_pos = end
+
+        # Drop consumed bytes once per call (deleting a bytearray prefix does not move the tail)
+        consumed = self.frame_start if self.frame_start >= 0 else self.scan_pos
+        if consumed > 0:
+            del buffer[:consumed]
+            self.scan_pos -= consumed
+            if self.frame_start >= 0:
+                self.frame_start -= consumed
+        return frames
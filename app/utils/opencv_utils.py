@@ -1,5 +1,5 @@
 """ Utility script for opencv functions """
-from typing import List, Tuple
+from typing import Optional, Tuple
 
 import cv2
 import numpy as np
@@ -15,7 +15,7 @@ def display_fps(frame: np.ndarray, fps: float) -> None:
         fps_text: str = f"FPS: {fps:.2f}"
         cv2.putText(frame, fps_text, ORG, FONT_FACE, FONT_SCALE, RED, LINE_THICKNESS)
 
-def draw_bboxes(bbox_locations: List[Tuple[int, int, int, int]], frame: np.ndarray) -> None:
+def draw_bboxes(bbox_locations: np.ndarray, frame: np.ndarray) -> None:
         """Draw bounding boxes for detections."""
         # Is there another way to draw the bboxes? Or can the bbox_locations be passed back to
         # the camera_service?
@@ -33,12 +33,39 @@ def draw_annotations(frame: np.ndarray, state: State) -> None:
 
     cv2.putText(frame, annotation_text, ORG, FONT_FACE, FONT_SCALE, color, LINE_THICKNESS)
 
-def encode_image(frame: np.ndarray, encoding: str = '.jpg'):
-    ret, encoded_data = cv2.imencode(encoding, frame)
+def encode_image(frame: np.ndarray, encoding: str = '.jpg', quality: Optional[int] = None):
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if quality is not None else []
+    ret, encoded_data = cv2.imencode(encoding, frame, params)
     return ret, encoded_data
 
-def resize_image(frame: np.ndarray, scale_factor: float):
+def resize_image(frame: np.ndarray, scale_factor: float, dst: Optional[np.ndarray] = None):
+    if dst is not None:
+        return cv2.resize(frame, (dst.shape[1], dst.shape[0]), dst=dst)
     return cv2.resize(frame, (0, 0), fx=scale_factor, fy=scale_factor)
 
-def convert_bgr2rgb(frame: np.ndarray):
-    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+def convert_bgr2rgb(frame: np.ndarray, dst: Optional[np.ndarray] = None):
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+
+def decode_image(jpeg: bytes, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """Decode a compressed image, returning an empty frame on failure."""
+    if len(jpeg) == 0:
+        return np.empty((0, 0, 3), dtype=np.uint8)
+    frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), flags)
+    if frame is None:
+        return np.empty((0, 0, 3), dtype=np.uint8)
+    return frame
+
+# Built-in JPEG decoder reductions, largest first
+REDUCED_DECODE_FLAGS: Tuple[Tuple[int, int], ...] = ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                                                     (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                                     (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+def decode_image_reduced(jpeg: bytes, scale_factor: float) -> Tuple[np.ndarray, float]:
+    """Decode a JPEG at the largest built-in reduction that keeps at least scale_factor of its resolution."""
+    for reduction, flags in REDUCED_DECODE_FLAGS:
+        if 1 / reduction >= scale_factor:
+            return decode_image(jpeg, flags), 1 / reduction
+    return decode_image(jpeg), 1.0
+
+def convert_bgr2gray(frame: np.ndarray, dst: Optional[np.ndarray] = None):
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
@@ -0,0 +1,80 @@
+""" Utility script for handing frames to worker processes through shared memory """
+import asyncio
+from contextlib import asynccontextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """Fixed set of shared memory slots that frames are copied into once and read by workers in place."""
+
+    def __init__(self, slot_count: int = 4, slot_bytes: int = 1 << 21):
+        self.slots: List[shared_memory.SharedMemory] = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(slot_count)]
+        self.free_slots: asyncio.Queue = asyncio.Queue()
+        for index in range(slot_count):
+            self.free_slots.put_nowait(index)
+
+    def write(self, index: int, frame: np.ndarray) -> str:
+        """Copy a frame into a slot, growing the slot if the frame does not fit, and return the slot's name.
+
+        Growing replaces the slot's segment, so the name changes; workers close their mapping of the old one when they see it.
+        """
+        if frame.nbytes > self.slots[index].size:
+            self.slots[index].close()
+            self.slots[index].unlink()
+            self.slots[index] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.slots[index].buf)[...] = frame
+        return self.slots[index].name
+
+    @asynccontextmanager
+    async def acquire(self, frame: np.ndarray) -> AsyncIterator[Tuple[int, str]]:
+        """Write a frame into a free slot, waiting for one if all are in use, and release it afterwards.
+
+        Yields the slot index and its current segment name, which is what attach_frame needs.
+        """
+        index = await self.free_slots.get()
+        try:
+            yield index, self.write(index, frame)
+        finally:
+            self.free_slots.put_nowait(index)
+
+    def close(self) -> None:
+        """Free every slot."""
+        for slot in self.slots:
+            slot.close()
+            slot.unlink()
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without registering it with the resource tracker.
+
+    The ring in the main process owns (and unlinks) the segment. Spawned workers share its resource tracker, so a
+    worker's registration (or unregistering it again) would clash with the owner's and warn about leaks at exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13+
+    except TypeError:
+        pass
+    # Older versions always register attached segments; workers run one job at a time, so swapping register out is safe
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach_frame(segments: Dict[int, shared_memory.SharedMemory], slot: Tuple[int, str], shape: Tuple[int, ...]) -> np.ndarray:
+    """Zero-copy view of a frame written by SharedFrameRing, keeping each slot's segment attached for reuse.
+
+    When a slot has been grown its name changes, and the mapping of the old segment is closed.
+    """
+    index, name = slot
+    segment = segments.get(index)
+    if segment is None or segment.name != name:
+        if segment is not None:
+            segment.close()
+        segment = segments[index] = _attach_segment(name)
+    return np.ndarray(shape, dtype=np.uint8, buffer=segment.buf)
@@ -0,0 +1,14 @@
+""" Utility script for building multipart MJPEG stream chunks """
+from typing import Union
+
+import numpy as np
+
+MULTIPART_BOUNDARY: str = 'frame'
+MULTIPART_MEDIA_TYPE: str = f'multipart/x-mixed-replace; boundary={MULTIPART_BOUNDARY}'
+MULTIPART_HEADER: bytes = f'--{MULTIPART_BOUNDARY}\r\nContent-Type: image/jpeg\r\n\r\n'.encode()
+MULTIPART_FOOTER: bytes = b'\r\n'
+
+
+def build_multipart_chunk(payload: Union[bytes, bytearray, memoryview, np.ndarray]) -> bytes:
+    """Build a complete multipart chunk (boundary header + JPEG payload) with a single copy."""
+    return b''.join((MULTIPART_HEADER, payload, MULTIPART_FOOTER))
@@ -0,0 +1,39 @@
+""" Utility script for reading and writing detection traces """
+import os
+import struct
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# A trace is a pair of append-only files: fixed-size per-frame records, and the boxes they refer to
+FRAMES_EXTENSION: str = '.frames'
+BOXES_EXTENSION: str = '.boxes'
+
+# timestamp (time.monotonic() seconds), StateId after the frame, person box count, face box count
+TRACE_FRAME_DTYPE: np.dtype = np.dtype([('timestamp', '<f8'), ('state', 'u1'), ('persons', '<u2'), ('faces', '<u2')])
+TRACE_FRAME_STRUCT: struct.Struct = struct.Struct('<dBHH')
+BOX_DTYPE: np.dtype = np.dtype('<i4') # (top, right, bottom, left) per box, persons then faces
+
+
+def encode_boxes(bboxes: np.ndarray) -> bytes:
+    """Boxes as little-endian int32, as stored in the boxes file."""
+    return np.ascontiguousarray(bboxes, dtype=BOX_DTYPE).tobytes()
+
+
+def read_frames(frames_path: str) -> np.ndarray:
+    """Load a trace's per-frame records, ignoring a partly written last record."""
+    data = np.fromfile(frames_path, dtype=np.uint8)
+    usable = len(data) - len(data) % TRACE_FRAME_DTYPE.itemsize
+    return data[:usable].view(TRACE_FRAME_DTYPE)
+
+
+def read_boxes(frames_path: str) -> Iterator[Tuple[float, int, np.ndarray, np.ndarray]]:
+    """Yield (timestamp, state, person boxes, face boxes) for each frame of a trace."""
+    frames = read_frames(frames_path)
+    boxes = np.fromfile(os.path.splitext(frames_path)[0] + BOXES_EXTENSION, dtype=BOX_DTYPE).reshape(-1, 4)
+    offset = 0
+    for timestamp, state, persons, faces in frames.tolist():
+        person_bboxes = boxes[offset:offset + persons]
+        face_bboxes = boxes[offset + persons:offset + persons + faces]
+        offset += persons + faces
+        yield timestamp, state, person_bboxes, face_bboxes
@@ -0,0 +1,79 @@
+""" Utility script for post-processing YOLO detections """
+from typing import Callable, Dict, List, Tuple, Union
+
+import cv2
+import numpy as np
+
+# Column layout of a YOLO (N, 6) detection array
+X1, Y1, X2, Y2, CONFIDENCE, CLASS_INDEX = range(6)
+
+# Reorders xyxy columns into the (top, right, bottom, left) convention used for bounding boxes
+TRBL_COLUMNS: List[int] = [Y1, X2, Y2, X1]
+
+
+def class_indices(names: Union[Dict[int, str], List[str]]) -> Dict[str, int]:
+    """Maps class names to YOLO class indices."""
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    return {name: index for index, name in items}
+
+def filter_detections(detections: np.ndarray, class_index: int, min_confidence: float, scale_factor: float) -> np.ndarray:
+    """Returns an (N, 4) int array of (top, right, bottom, left) boxes for one class, scaled by 1/scale_factor."""
+    mask = (detections[:, CLASS_INDEX] == class_index) & (detections[:, CONFIDENCE] >= min_confidence)
+    return (detections[mask][:, TRBL_COLUMNS] / scale_factor).astype(np.int32)
+
+def scale_boxes(boxes: List, scale_factor: float) -> np.ndarray:
+    """Converts (top, right, bottom, left) boxes to an (N, 4) int array scaled by 1/scale_factor."""
+    return (np.asarray(boxes, dtype=np.float32).reshape(-1, 4) / scale_factor).astype(np.int32)
+
+def letterbox(image: np.ndarray, size: int, color: Tuple[int, int, int] = (114, 114, 114)) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resizes an image to fit a size x size square, keeping its aspect ratio, and pads the rest."""
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = round(width * ratio), round(height * ratio)
+    pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+
+    if (new_height, new_width) != (height, width):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    padded = cv2.copyMakeBorder(image, pad_y, size - new_height - pad_y, pad_x, size - new_width - pad_x,
+                                cv2.BORDER_CONSTANT, value=color)
+    return padded, ratio, (pad_x, pad_y)
+
+def to_blob(images: List[np.ndarray]) -> np.ndarray:
+    """Stacks HWC uint8 RGB images into a contiguous NCHW float32 blob in [0, 1]."""
+    return np.ascontiguousarray(np.stack(images).transpose(0, 3, 1, 2), dtype=np.float32) / 255
+
+def non_max_suppression(prediction: np.ndarray, min_confidence: float = 0.25, iou_threshold: float = 0.45, max_detections: int = 300) -> np.ndarray:
+    """Turns raw (N, 5 + classes) YOLO output for one image into an (M, 6) xyxy/confidence/class array."""
+    prediction = prediction[prediction[:, 4] > min_confidence]
+    scores = prediction[:, 5:] * prediction[:, 4:5]
+    classes = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), classes]
+    keep = confidences > min_confidence
+    prediction, classes, confidences = prediction[keep], classes[keep], confidences[keep]
+    if len(prediction) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+
+    # xywh (center) -> xyxy
+    boxes = np.empty((len(prediction), 4), dtype=np.float32)
+    boxes[:, :2] = prediction[:, :2] - prediction[:, 2:4] / 2
+    boxes[:, 2:] = prediction[:, :2] + prediction[:, 2:4] / 2
+
+    # Offset boxes by class so a single NMS pass never suppresses across classes
+    offsets = classes[:, None].astype(np.float32) * 4096
+    nms_boxes = np.concatenate([boxes[:, :2] + offsets, prediction[:, 2:4]], axis=1)
+    indices = np.asarray(cv2.dnn.NMSBoxes(nms_boxes.tolist(), confidences.tolist(), min_confidence, iou_threshold), dtype=np.int64).reshape(-1)[:max_detections]
+    return np.concatenate([boxes[indices], confidences[indices, None], classes[indices, None]], axis=1).astype(np.float32)
+
+def unletterbox(detections: np.ndarray, ratio: float, pad: Tuple[int, int]) -> np.ndarray:
+    """Maps xyxy detection boxes from letterboxed coordinates back to the original image, in place."""
+    detections[:, [X1, X2]] = (detections[:, [X1, X2]] - pad[0]) / ratio
+    detections[:, [Y1, Y2]] = (detections[:, [Y1, Y2]] - pad[1]) / ratio
+    return detections
+
+def detect_letterboxed(rgb_frames: List[np.ndarray], image_size: int, forward: Callable[[np.ndarray], np.ndarray],
+                       min_confidence: float, iou_threshold: float) -> List[np.ndarray]:
+    """Runs one raw YOLO forward pass on a batch of letterboxed frames and returns (N, 6) detections per frame, in frame coordinates."""
+    letterboxed = [letterbox(rgb_frame, image_size) for rgb_frame in rgb_frames]
+    prediction = forward(to_blob([image for image, _, _ in letterboxed]))
+    return [unletterbox(non_max_suppression(prediction[index], min_confidence, iou_threshold), ratio, pad)
+            for index, (_, ratio, pad) in enumerate(letterboxed)]
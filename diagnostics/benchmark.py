@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.services.camera_pipeline_service import CameraPipelineService
+from app.services.config_loader_service import ConfigLoaderService
+from app.services.executor_service import ExecutorService
+from app.services.metrics_service import MetricsService
+from app.services.model_loader_service import ModelLoaderService
+from diagnostics.replay_states import RecordingNotificationService
+
+SOURCE: str = 'benchmark'
+
+
+def git_commit() -> str:
+    """Commit the benchmark ran on, so results can be compared across commits."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1 << 20) if sys.platform == 'darwin' else max_rss / 1024 # bytes on macOS, KiB on Linux
+
+
+def cpu_seconds() -> float:
+    """User plus system CPU time of this process, across all threads."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def run_benchmark(pipeline: CameraPipelineService, metrics: MetricsService, frames: int, warmup: int, render: bool) -> dict:
+    """Push frames through DetectorService.process_frame (and so the state machine) as fast as they are processed."""
+    detector_service = pipeline.detector_service
+
+    # Model warm up and buffer allocation are left out of the measurements
+    metrics.enabled = False
+    for _ in range(warmup):
+        await detector_service.process_frame(render=render)
+    metrics.enabled = True
+
+    start_cpu = cpu_seconds()
+    start = time.perf_counter()
+    for _ in range(frames):
+        await detector_service.process_frame(render=render)
+    wall_seconds = time.perf_counter() - start
+    cpu_used = cpu_seconds() - start_cpu
+
+    return {'frames': frames,
+            'wall_seconds': wall_seconds,
+            'fps': frames / wall_seconds if wall_seconds > 0 else 0,
+            'cpu_seconds': cpu_used,
+            'cpu_ms_per_frame': cpu_used / frames * 1000 if frames else 0,
+            'peak_rss_mb': peak_rss_mb(),
+            'clip_mb': pipeline.camera_service.get_memory_usage() / (1 << 20), # Included in peak_rss_mb
+            'stages': metrics.get_stage_latencies().get(SOURCE, {}),
+            'dwell_times': pipeline.state_manager_service.get_dwell_times()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded clip (or synthetic frames) through the detection pipeline and save the results as JSON.")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--video', default='', help="Clip to replay (synthetic frames if omitted)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames measured")
+    parser.add_argument('--warmup', type=int, default=10, help="Frames processed before measuring")
+    parser.add_argument('--clip-frames', type=int, default=100, help="Frames held in memory and looped over")
+    parser.add_argument('--backend', default='', help="Model backend, defaults to model.backend from the config")
+    parser.add_argument('--scale-factor', type=float, help="Overrides video.scale_factor")
+    parser.add_argument('--width', type=int, help="Overrides video.image_width")
+    parser.add_argument('--height', type=int, help="Overrides video.image_height")
+    parser.add_argument('--render', action='store_true', help="Also decode and annotate full resolution frames, as when someone is watching")
+    parser.add_argument('--output', default='', help="Results file, defaults to benchmarks/<time>_<commit>.json")
+    args = parser.parse_args()
+
+    config = ConfigLoaderService(args.config).config
+    overrides = {'camera_backend': 'file', 'source_path': args.video, 'loop': True, 'realtime': False,
+                 'max_frames': min(args.frames + args.warmup, args.clip_frames)}
+    for key, value in (('scale_factor', args.scale_factor), ('image_width', args.width), ('image_height', args.height)):
+        if value is not None:
+            overrides[key] = value
+    camera_config = {'id': SOURCE, **overrides}
+
+    model_loader = ModelLoaderService(config.get('model', {}))
+    engine = model_loader.load(args.backend)
+    metrics = MetricsService({**config.get('metrics', {}), 'enabled': True})
+    executor = ExecutorService(config.get('executor', {}))
+    pipeline = CameraPipelineService(camera_config, config, engine, RecordingNotificationService(), executor=executor, metrics=metrics)
+
+    try:
+        results = asyncio.run(run_benchmark(pipeline, metrics, args.frames, args.warmup, args.render))
+    finally:
+        pipeline.release_resources()
+        executor.shutdown()
+
+    commit = git_commit()
+    report = {'commit': commit,
+              'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+              'platform': platform.platform(),
+              'python': platform.python_version(),
+              'settings': {'video': args.video or 'synthetic', 'backend': engine.name, 'render': args.render,
+                           'video_config': pipeline.video_config},
+              'results': results}
+
+    output = args.output or os.path.join('benchmarks', f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print(f"{results['frames']} frames: {results['fps']:.1f} fps, {results['cpu_ms_per_frame']:.1f} ms CPU/frame, peak RSS {results['peak_rss_mb']:.0f} MB")
+    print(f"{'stage':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'count':>8}")
+    for stage, latency in results['stages'].items():
+        print(f"{stage:<14}{latency.get('p50_ms', 0):>10.2f}{latency.get('p95_ms', 0):>10.2f}{latency.get('p99_ms', 0):>10.2f}{latency['count']:>8}")
+    print(f"Saved {output}")
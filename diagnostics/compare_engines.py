@@ -0,0 +1,54 @@
+import argparse
+from typing import List
+
+import cv2
+import numpy as np
+
+from app.services.config_loader_service import ConfigLoaderService
+from app.services.model_loader_service import ModelLoaderService
+from app.utils.engine_utils import compare_engines
+from app.utils.opencv_utils import convert_bgr2rgb, resize_image
+
+BACKENDS: List[str] = ['torch', 'torchscript', 'onnxruntime', 'onnxruntime_int8', 'opencv_dnn']
+
+
+def load_frames(video_path: str, frame_count: int, scale_factor: float) -> List[np.ndarray]:
+    """Read frames from a video file (or make random ones) at detection resolution, as RGB."""
+    if not video_path:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (270, 480, 3), dtype=np.uint8) for _ in range(frame_count)]
+
+    video_capture = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < frame_count:
+        ret, frame = video_capture.read()
+        if not ret:
+            break
+        frames.append(convert_bgr2rgb(resize_image(frame, scale_factor)))
+    video_capture.release()
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare detection backend latency on the same frames.")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--video', default='', help="Video file to take frames from (random frames if omitted)")
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=BACKENDS)
+    args = parser.parse_args()
+
+    config = ConfigLoaderService(args.config).config
+    model_loader = ModelLoaderService(config.get('model', {}))
+    frames = load_frames(args.video, args.frames, config['video'].get('scale_factor', 0.25))
+
+    engines = []
+    for backend in args.backends:
+        try:
+            engines.append(model_loader.load(backend))
+        except Exception as e:
+            print(f"Skipping {backend}: {e}")
+
+    results = compare_engines(engines, frames)
+    print(f"{'backend':<18}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'fps':>8}{'dets':>8}")
+    for name, stats in results.items():
+        print(f"{name:<18}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['fps']:>8.1f}{stats['detections_per_frame']:>8.2f}")
@@ -0,0 +1,46 @@
+import argparse
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class NotificationHandler(BaseHTTPRequestHandler):
+    """Stands in for the Pushover API: logs each message and fails the first --fail requests."""
+    failures_left: int = 0
+    delay: float = 0
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        fields = parse_qs(self.rfile.read(length).decode())
+        if self.delay:
+            time.sleep(self.delay)
+
+        if NotificationHandler.failures_left > 0:
+            NotificationHandler.failures_left -= 1
+            status, body = 500, b'{"status":0}'
+        else:
+            status, body = 200, b'{"status":1}'
+        print(f"{status} {fields.get('message', [''])[0]}")
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the notification API (set notification.URL to http://<host>:<port>/).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--fail', type=int, default=0, help="Number of requests to fail before succeeding")
+    parser.add_argument('--delay', type=float, default=0, help="Seconds to wait before responding, to simulate a slow link")
+    args = parser.parse_args()
+
+    NotificationHandler.failures_left = args.fail
+    NotificationHandler.delay = args.delay
+    print(f"Listening on http://{args.host}:{args.port}/")
+    ThreadingHTTPServer((args.host, args.port), NotificationHandler).serve_forever()
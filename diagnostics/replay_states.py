@@ -0,0 +1,100 @@
+import argparse
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.state_manager_service import StateManagerService
+from app.states.legacy_state_classes import IdleState, State
+
+Detection = Tuple[bool, bool]
+
+
+class RecordingNotificationService:
+    """Collects notifications instead of sending them."""
+
+    def __init__(self):
+        self.messages: List[str] = []
+
+    def send_notification(self, message: str, source: str = 'default') -> None:
+        self.messages.append(message)
+
+
+class LegacyStateManager:
+    """The state manager as it was before the transition table, driving the original state classes."""
+
+    def __init__(self, max_no_face_count: int, message: str, notification_service: RecordingNotificationService):
+        self.state: State = IdleState(self)
+        self.no_face_count: int = 0
+        self.max_no_face_count: int = max_no_face_count
+        self.notification_service: RecordingNotificationService = notification_service
+        self.message: str = message
+
+    def set_state(self, state: State) -> None:
+        self.state = state
+
+    def process_frame(self, person_detected: bool, face_detected: bool) -> None:
+        self.state.process_frame(person_detected, face_detected)
+
+    def get_state(self) -> State:
+        return self.state
+
+
+def load_sequence(path: str) -> List[Detection]:
+    """Read 'person face' pairs (0/1, one frame per line) from a recorded sequence."""
+    sequence = []
+    with open(path) as f:
+        for line in f:
+            fields = line.replace(',', ' ').split()
+            if len(fields) >= 2 and not line.startswith('#'):
+                sequence.append((fields[0] == '1', fields[1] == '1'))
+    return sequence
+
+
+def random_sequence(frame_count: int, seed: int) -> List[Detection]:
+    """Runs of each detection pattern with per-frame flicker, like a real camera produces."""
+    rng = np.random.default_rng(seed)
+    sequence: List[Detection] = []
+    while len(sequence) < frame_count:
+        person, face = bool(rng.integers(2)), bool(rng.integers(2))
+        flicker = rng.random() * 0.3
+        for _ in range(int(rng.integers(1, 200))):
+            sequence.append((person != (rng.random() < flicker), face != (rng.random() < flicker)))
+    return sequence[:frame_count]
+
+
+def replay(sequence: List[Detection], threshold: int) -> int:
+    """Drive both state machines with the same detections, returning the first frame where they differ (-1 if none).
+
+    Detections are one second apart, so the time based threshold (in seconds) matches the legacy frame count.
+    """
+    config = {'threshold': {'no_face_seconds': threshold, 'max_event_gap': 1.0}, 'notification': {'MESSAGE': 'replay'}}
+    legacy_notifications = RecordingNotificationService()
+    table_notifications = RecordingNotificationService()
+    legacy = LegacyStateManager(threshold, 'replay', legacy_notifications)
+    table = StateManagerService(config, table_notifications)
+
+    for index, (person_detected, face_detected) in enumerate(sequence):
+        legacy.process_frame(person_detected, face_detected)
+        table.process_frame(person_detected, face_detected, float(index))
+        legacy_state, table_state = legacy.get_state(), table.get_state()
+        if (legacy_state.get_annotation() != table_state.get_annotation() or legacy_state.get_color() != table_state.get_color()
+                or legacy.no_face_count != table.no_face_time or len(legacy_notifications.messages) != len(table_notifications.messages)):
+            print(f"Frame {index} ({person_detected}, {face_detected}): legacy {legacy_state.get_annotation()} count {legacy.no_face_count}, "
+                  f"table {table_state.get_annotation()} time {table.no_face_time}")
+            return index
+    print(f"{len(sequence)} frames, threshold {threshold}: identical ({len(table_notifications.messages)} notifications)")
+    return -1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the transition table state machine matches the original state classes.")
+    parser.add_argument('sequences', nargs='*', help="Recorded sequences with one 'person face' (0/1) pair per line")
+    parser.add_argument('--frames', type=int, default=100000, help="Length of the random sequence used when no files are given")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--thresholds', type=int, nargs='+', default=[1, 5, 30, 100])
+    args = parser.parse_args()
+
+    sequences = [load_sequence(path) for path in args.sequences] or [random_sequence(args.frames, args.seed)]
+    mismatches = [replay(sequence, threshold) for sequence in sequences for threshold in args.thresholds]
+    sys.exit(1 if any(index >= 0 for index in mismatches) else 0)
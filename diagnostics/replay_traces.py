@@ -0,0 +1,121 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.services.config_loader_service import ConfigLoaderService
+from app.services.state_manager_service import StateManagerService
+from app.services.trace_recorder_service import TraceRecorderService
+from app.states.state_classes import StateId
+from app.utils.trace_utils import FRAMES_EXTENSION, read_frames
+from diagnostics.replay_states import (RecordingNotificationService,
+                                       random_sequence)
+
+Detections = Tuple[List[float], List[bool], List[bool]]
+
+
+def find_traces(paths: List[str]) -> List[str]:
+    """Trace frame files named directly or found under the given directories."""
+    traces = []
+    for path in paths:
+        if os.path.isdir(path):
+            traces += sorted(glob.glob(os.path.join(path, '**', '*' + FRAMES_EXTENSION), recursive=True))
+        else:
+            traces.append(path)
+    return traces
+
+
+def load_detections(frames_path: str) -> Tuple[Detections, int, float]:
+    """Timestamps and person/face flags of a trace, the alerts fired while it was recorded, and the hours it covers."""
+    frames = read_frames(frames_path)
+    if len(frames) == 0:
+        return ([], [], []), 0, 0
+    # Every entry into NoFace sent one alert (the smoothed state, so this reflects the settings it was recorded with)
+    no_face = frames['state'] == StateId.NO_FACE_DETECTED
+    recorded_alerts = int(np.count_nonzero(no_face[1:] & ~no_face[:-1]) + no_face[0])
+    hours = float(frames['timestamp'][-1] - frames['timestamp'][0]) / 3600
+    # Plain lists iterate several times faster than numpy scalars in the replay loop
+    detections = (frames['timestamp'].tolist(), (frames['persons'] > 0).tolist(), (frames['faces'] > 0).tolist())
+    return detections, recorded_alerts, hours
+
+
+def count_alerts(frames_path: str, threshold_config: dict, monitor_config: dict) -> int:
+    """Replay a trace through a fresh state machine with threshold_config, returning how many alerts it sends."""
+    (timestamps, persons, faces), _, _ = load_detections(frames_path)
+    notifications = RecordingNotificationService()
+    state_manager = StateManagerService({'threshold': threshold_config, 'monitor': monitor_config, 'notification': {'MESSAGE': 'replay'}},
+                                        notifications)
+    process_frame = state_manager.process_frame
+    for timestamp, person_detected, face_detected in zip(timestamps, persons, faces):
+        process_frame(person_detected, face_detected, timestamp)
+    return len(notifications.messages)
+
+
+def write_synthetic_trace(directory: str, hours: float, detection_rate: float, seed: int) -> None:
+    """Record a synthetic trace (see replay_states.random_sequence), for trying out the replay without a camera."""
+    recorder = TraceRecorderService({'directory': directory, 'buffer_bytes': 1 << 20, 'flush_interval': float('inf')}, 'synthetic')
+    box = np.array([[0, 1, 1, 0]], dtype=np.int32)
+    no_boxes = box[:0]
+    for index, (person_detected, face_detected) in enumerate(random_sequence(int(hours * 3600 * detection_rate), seed)):
+        face_detected = person_detected and face_detected
+        recorder.record(index / detection_rate, 0, box if person_detected else no_boxes, box if face_detected else no_boxes)
+    recorder.close()
+    print(f"Wrote {recorder.frames_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded detection traces through the state machine and count the alerts each threshold would send.")
+    parser.add_argument('traces', nargs='*', help="Trace .frames files or directories of them (see the trace config section)")
+    parser.add_argument('--config', default='config/config.yaml', help="Threshold settings not given on the command line come from here")
+    parser.add_argument('--thresholds', type=float, nargs='+', help="no_face_seconds values to compare, defaults to the configured one")
+    parser.add_argument('--smoothing-frames', type=int, nargs='+', help="smoothing_frames values to compare")
+    parser.add_argument('--person-hits', type=int)
+    parser.add_argument('--face-hits', type=int)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Traces and settings replayed in parallel")
+    parser.add_argument('--synthetic-hours', type=float, default=0, help="Record a synthetic trace of this length to traces/ first")
+    parser.add_argument('--detection-rate', type=float, default=5, help="Detections per second in the synthetic trace")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config: dict = ConfigLoaderService(args.config).config if os.path.exists(args.config) else {}
+    threshold_config: dict = config.get('threshold', {})
+    monitor_config: dict = config.get('monitor', {}) # The idle cadence sets how long a gap between detections counts
+    for key, value in (('person_hits', args.person_hits), ('face_hits', args.face_hits)):
+        if value is not None:
+            threshold_config[key] = value
+
+    paths = args.traces
+    if args.synthetic_hours > 0:
+        write_synthetic_trace('traces', args.synthetic_hours, args.detection_rate, args.seed)
+        paths = paths or [os.path.join('traces', 'synthetic')]
+    traces = find_traces(paths)
+    if not traces:
+        sys.exit("No traces found")
+
+    start = time.perf_counter()
+    loaded = [load_detections(path) for path in traces]
+    recorded_alerts = sum(alerts for _, alerts, _ in loaded)
+    hours = sum(trace_hours for _, _, trace_hours in loaded)
+    frame_count = sum(len(timestamps) for (timestamps, _, _), _, _ in loaded)
+    del loaded
+
+    settings: List[Dict] = [{**threshold_config, 'no_face_seconds': threshold, 'smoothing_frames': smoothing_frames}
+                            for threshold in args.thresholds or [threshold_config.get('no_face_seconds', 3.3)]
+                            for smoothing_frames in args.smoothing_frames or [threshold_config.get('smoothing_frames', 1)]]
+    # Each trace is a separate run of the camera, so every (setting, trace) pair replays independently in its own process
+    jobs = [(setting, path) for setting in settings for path in traces]
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(jobs)))) as pool:
+        counts = list(pool.map(count_alerts, [path for _, path in jobs], [setting for setting, _ in jobs], [monitor_config] * len(jobs)))
+    alerts = [sum(counts[index * len(traces):(index + 1) * len(traces)]) for index in range(len(settings))]
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(traces)} traces, {frame_count} detections, {hours:.1f} hours ({recorded_alerts} alerts while recording)")
+    print(f"{'no_face_s':>10}{'smoothing':>10}{'alerts':>8}{'per hour':>10}")
+    for setting, count in zip(settings, alerts):
+        print(f"{setting['no_face_seconds']:>10.1f}{setting['smoothing_frames']:>10}{count:>8}{count / hours if hours else 0:>10.2f}")
+    print(f"Replayed {frame_count * len(settings)} detections in {elapsed:.1f}s")
@@ -1,24 +1,60 @@
+from app.services.batch_scheduler_service import BatchSchedulerService
+from app.services.camera_pipeline_service import CameraPipelineService
 from app.services.config_loader_service import ConfigLoaderService
-from app.services.detection_service import DetectionService
-from app.services.detector_service import DetectorService
-from app.services.opencv_camera_service import \
-    OpenCVCameraService as CameraService
+from app.services.detection_worker_service import DetectionWorkerService
+from app.services.executor_service import ExecutorService
+from app.services.metrics_service import MetricsService
+from app.services.model_loader_service import ModelLoaderService
+from app.services.notification_dispatcher_service import \
+    NotificationDispatcherService
 from app.services.pushover_service import \
     PushoverService as NotificationService
 from app.services.server_service import ServerService
-from app.services.state_manager_service import StateManagerService
-
-# Load Services
-config_loader = ConfigLoaderService('config/config.yaml')
-camera_service = CameraService(config_loader.config['video'])
-detection_service = DetectionService(scale_factor=config_loader.config['video'].get('scale_factor', 0.25))
-notification_service = NotificationService(api_token=config_loader.config['notification'].get('API_TOKEN'), user_key=config_loader.config['notification'].get('USER_KEY'))
-state_manager_service = StateManagerService(config=config_loader.config, notification_service=notification_service)
-detector_service = DetectorService(camera_service, detection_service, state_manager_service)
-server_service = ServerService(config=config_loader.config, camera_service=camera_service, state_manager_service=state_manager_service, detector_service=detector_service)
 
 if __name__ == "__main__":
+    # Services are only built here: detection worker processes are spawned and re-import this module.
+    # The executor and metrics are shared by every camera, so the pool bounds and measurements cover the whole server
+    config_loader = ConfigLoaderService('config/config.yaml')
+    camera_configs = config_loader.config.get('cameras') or [{'id': 'default'}]
+    executor = ExecutorService(config_loader.config.get('executor', {}))
+    metrics = MetricsService(config_loader.config.get('metrics', {}))
+    worker_config = config_loader.config.get('detection_workers', {})
+    if worker_config.get('enabled', False):
+        # The model is loaded inside the worker processes instead
+        detection_workers = DetectionWorkerService(config_loader.config.get('model', {}), worker_config)
+        engine = None
+        batch_scheduler = None
+    else:
+        detection_workers = None
+        model_loader = ModelLoaderService(config_loader.config.get('model', {}))
+        engine = model_loader.load()
+        batch_config = config_loader.config.get('batching', {})
+        if batch_config.get('enabled', False):
+            batch_scheduler = BatchSchedulerService(engine, executor, max_batch_size=batch_config.get('max_batch_size', 4), batch_window_ms=batch_config.get('batch_window_ms', 10))
+        elif len(camera_configs) > 1:
+            # Without batching, cameras still take turns on the shared model one frame at a time
+            batch_scheduler = BatchSchedulerService(engine, executor, max_batch_size=1, batch_window_ms=0)
+        else:
+            batch_scheduler = None
+    notification_config = config_loader.config['notification']
+    # The state machines only queue notifications; the dispatcher sends them off the frame loop
+    notification_service = NotificationDispatcherService(NotificationService(api_token=notification_config.get('API_TOKEN'), user_key=notification_config.get('USER_KEY'),
+                                                                             url=notification_config.get('URL', ''), timeout=notification_config.get('timeout', 5.0)),
+                                                         notification_config)
+    pipelines = {}
+    for camera_config in camera_configs:
+        pipeline = CameraPipelineService(camera_config, config_loader.config, engine, notification_service, batch_scheduler=batch_scheduler,
+                                         executor=executor, detection_workers=detection_workers, metrics=metrics)
+        pipelines[pipeline.camera_id] = pipeline
+    server_service = ServerService(config=config_loader.config, pipelines=pipelines, executor=executor, notification_dispatcher=notification_service, metrics=metrics,
+                                   batch_scheduler=batch_scheduler)
+
     try:
         server_service.run()
     finally:
+        for pipeline in pipelines.values():
+            pipeline.release_resources()
+        if detection_workers is not None:
+            detection_workers.shutdown()
+        executor.shutdown()
         print("Server shutdown.")
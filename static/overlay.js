@@ -0,0 +1,50 @@
+// Draws the latest detections from /overlay/<camera id> on top of each passthrough video stream.
+const POLL_INTERVAL_MS = 200;
+
+// State colors are BGR tuples shared with the OpenCV drawing code
+function toCssColor(bgr) {
+  return `rgb(${bgr[2]}, ${bgr[1]}, ${bgr[0]})`;
+}
+
+function drawBoxes(context, boxes, scaleX, scaleY) {
+  for (const [top, right, bottom, left] of boxes) {
+    context.strokeRect(left * scaleX, top * scaleY, (right - left) * scaleX, (bottom - top) * scaleY);
+  }
+}
+
+function drawOverlay(canvas, overlay) {
+  const context = canvas.getContext('2d');
+  context.clearRect(0, 0, canvas.width, canvas.height);
+  if (!overlay.width || !overlay.height) {
+    return;
+  }
+  const scaleX = canvas.width / overlay.width;
+  const scaleY = canvas.height / overlay.height;
+
+  context.lineWidth = 2;
+  context.strokeStyle = 'rgb(0, 255, 0)';
+  drawBoxes(context, overlay.persons, scaleX, scaleY);
+  drawBoxes(context, overlay.faces, scaleX, scaleY);
+
+  // Un-mirror the text so it stays readable
+  context.save();
+  context.scale(-1, 1);
+  context.font = '30px sans-serif';
+  context.fillStyle = toCssColor(overlay.color);
+  context.fillText(overlay.annotation, -canvas.width + 10, 50);
+  context.restore();
+}
+
+async function pollOverlay(canvas) {
+  try {
+    const response = await fetch(`/overlay/${encodeURIComponent(canvas.dataset.cameraId)}`);
+    if (response.ok) {
+      drawOverlay(canvas, await response.json());
+    }
+  } catch (error) {
+    console.error('Failed to fetch overlay', error);
+  }
+  setTimeout(() => pollOverlay(canvas), POLL_INTERVAL_MS);
+}
+
+document.querySelectorAll('canvas.overlay').forEach(pollOverlay);